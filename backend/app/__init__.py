@@ -1,28 +1,62 @@
 import os
+import orjson
 from flask import Flask
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from flask_jwt_extended import JWTManager
 
 from .config import Config
-from .extensions import db, migrate, celery_app
+from .extensions import db, migrate, limiter
 
 socketio = SocketIO()
 jwt = JWTManager()
 
 
+class OrjsonProvider(JSONProvider):
+    """orjson-backed JSON provider - serializes list endpoints 3-5x faster
+    than stdlib json and handles datetime/UUID natively."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # orjson emits bytes; hand them straight to the response instead of
+        # the default dumps()->str->encode round-trip jsonify would do
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=str), mimetype='application/json'
+        )
+
+
 def create_app(config_class=Config):
     """Application factory for creating Flask app instances"""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     app.config.from_object(config_class)
-    
+
+    # Promotion thresholds are immutable at runtime; resolve the nested
+    # lookups once at startup
+    _thresholds = app.config.get('PROCESSING_CONFIG', {}) \
+        .get('training', {}).get('promotion_thresholds', {})
+    app.config['PROMOTION_THRESHOLDS'] = (
+        _thresholds.get('roc_auc', 0.75), _thresholds.get('f1', 0.65)
+    )
+
     # initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    limiter.init_app(app)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     socketio.init_app(app, cors_allowed_origins="*", message_queue=app.config['REDIS_URL'])
-    celery_app.conf.update(app.config)
+
+    # Bind the shared Celery app to this Flask app's config (broker URL etc.)
+    from .celery_worker import init_celery
+    init_celery(app)
     
     # register blueprints
     from .api.ingest import ingest_bp
@@ -41,8 +75,11 @@ def create_app(config_class=Config):
     from .websocket import register_socket_handlers
     register_socket_handlers(socketio)
     
-    # create database tables if they dont exist
-    with app.app_context():
-        db.create_all()
-    
+    # create database tables if they dont exist (dev/test convenience;
+    # production deploys run migrations instead, so N workers don't each
+    # hammer the DB with CREATE IF NOT EXISTS at boot)
+    if app.config.get('AUTO_CREATE_TABLES', False):
+        with app.app_context():
+            db.create_all()
+
     return app
@@ -7,14 +7,77 @@ from flask_jwt_extended import (
     jwt_required, get_jwt_identity, get_jwt
 )
 from datetime import datetime
-import bcrypt
+import time
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
 
 from ..models import db, User, AuditLog
+from ..extensions import limiter
+from ..services.bcrypt_pool import bcrypt_pool, BcryptPoolBusy
 
 auth_bp = Blueprint('auth', __name__)
 
 
+def _auth_rate_limit():
+    return current_app.config.get('AUTH_RATE_LIMIT', '5 per minute; 20 per hour')
+
+
+def _login_rate_key():
+    """Rate-limit login per (client IP, username) to slow credential stuffing."""
+    data = request.get_json(silent=True) or {}
+    return f"{request.remote_addr}:{data.get('username', '')}"
+
+# Short-lived cache of serialized user payloads so hot authenticated endpoints
+# skip the per-request User lookup. Dicts (not ORM instances) are cached to
+# avoid detached-instance issues across requests; writes invalidate below.
+_USER_CACHE_TTL = 30  # seconds
+_USER_CACHE_MAX = 10000
+_user_cache = {}
+
+
+def _load_current_user(user_id):
+    """Return the serialized user for user_id, from cache when fresh."""
+    entry = _user_cache.get(user_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    # Project to the columns to_dict() serializes - skips the bcrypt hash blob
+    user = User.query.options(load_only(
+        User.id, User.username, User.email, User.role,
+        User.is_active, User.created_at, User.last_login
+    )).get(user_id)
+    if not user:
+        _user_cache.pop(user_id, None)
+        return None
+
+    if len(_user_cache) >= _USER_CACHE_MAX:
+        _user_cache.clear()
+
+    payload = user.to_dict()
+    _user_cache[user_id] = (time.monotonic() + _USER_CACHE_TTL, payload)
+    return payload
+
+
+def _invalidate_cached_user(user_id):
+    _user_cache.pop(str(user_id), None)
+
+
+def _bcrypt_rounds():
+    return current_app.config.get('BCRYPT_ROUNDS', 12)
+
+
+def _stored_hash_rounds(password_hash):
+    """Extract the cost factor embedded in a bcrypt hash ($2b$<cost>$...)."""
+    if isinstance(password_hash, str):
+        password_hash = password_hash.encode('utf-8')
+    try:
+        return int(password_hash.split(b'$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
 @auth_bp.route('/auth/register', methods=['POST'])
+@limiter.limit(_auth_rate_limit)
 def register():
     """Register a new user."""
     data = request.get_json()
@@ -30,19 +93,23 @@ def register():
     if len(data['password']) < 8:
         return jsonify({'error': 'Password must be at least 8 characters'}), 400
     
-    # Check existing user
-    if User.query.filter_by(username=data['username']).first():
+    # Check existing user - EXISTS avoids loading and hydrating a full row
+    if db.session.query(
+        User.query.filter_by(username=data['username']).exists()
+    ).scalar():
         return jsonify({'error': 'Username already exists'}), 409
-    
-    if User.query.filter_by(email=data['email']).first():
+
+    if db.session.query(
+        User.query.filter_by(email=data['email']).exists()
+    ).scalar():
         return jsonify({'error': 'Email already exists'}), 409
     
     # Hash password
-    password_hash = bcrypt.hashpw(
-        data['password'].encode('utf-8'),
-        bcrypt.gensalt()
-    ).decode('utf-8')
-    
+    try:
+        password_hash = bcrypt_pool.hash(data['password'], rounds=_bcrypt_rounds())
+    except BcryptPoolBusy:
+        return jsonify({'error': 'Server busy, retry shortly'}), 503, {'Retry-After': '1'}
+
     user = User(
         username=data['username'],
         email=data['email'],
@@ -59,6 +126,7 @@ def register():
 
 
 @auth_bp.route('/auth/login', methods=['POST'])
+@limiter.limit(_auth_rate_limit, key_func=_login_rate_key)
 def login():
     """username: Username or email / password: Password
     """
@@ -68,32 +136,42 @@ def login():
         return jsonify({'error': 'Username and password required'}), 400
     
     # Find user by username or email
-    user = User.query.filter(
-        (User.username == data['username']) | (User.email == data['username'])
-    ).first()
+    user = db.session.execute(
+        select(User).where(
+            (User.username == data['username']) | (User.email == data['username'])
+        ).limit(1)
+    ).scalar()
     
     if not user:
         return jsonify({'error': 'Invalid credentials'}), 401
     
     # Verify password
-    if not bcrypt.checkpw(data['password'].encode('utf-8'), user.password_hash.encode('utf-8')):
-        return jsonify({'error': 'Invalid credentials'}), 401
+    try:
+        if not bcrypt_pool.check(data['password'], user.password_hash):
+            return jsonify({'error': 'Invalid credentials'}), 401
+    except BcryptPoolBusy:
+        return jsonify({'error': 'Server busy, retry shortly'}), 503, {'Retry-After': '1'}
     
     if not user.is_active:
         return jsonify({'error': 'Account is disabled'}), 401
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.session.commit()
-    
+    # Lazily roll the stored hash forward if the configured cost changed
+    target_rounds = _bcrypt_rounds()
+    if _stored_hash_rounds(user.password_hash) != target_rounds:
+        try:
+            user.password_hash = bcrypt_pool.hash(data['password'], rounds=target_rounds)
+        except BcryptPoolBusy:
+            pass  # Rehash on a later login instead of failing this one
+
     # Create tokens
     access_token = create_access_token(
         identity=str(user.id),
         additional_claims={'role': user.role, 'username': user.username}
     )
     refresh_token = create_refresh_token(identity=str(user.id))
-    
-    # Audit log
+
+    # Update last login + audit log in a single transaction
+    user.last_login = datetime.utcnow()
     audit = AuditLog(
         user_id=user.id,
         action='login',
@@ -103,6 +181,7 @@ def login():
     )
     db.session.add(audit)
     db.session.commit()
+    _invalidate_cached_user(user.id)
     
     return jsonify({
         'access_token': access_token,
@@ -115,14 +194,14 @@ def login():
 @jwt_required(refresh=True)
 def refresh():
     identity = get_jwt_identity()
-    user = User.query.get(identity)
-    
-    if not user or not user.is_active:
+    user = _load_current_user(identity)
+
+    if not user or not user['is_active']:
         return jsonify({'error': 'Invalid user'}), 401
-    
+
     access_token = create_access_token(
         identity=identity,
-        additional_claims={'role': user.role, 'username': user.username}
+        additional_claims={'role': user['role'], 'username': user['username']}
     )
     
     return jsonify({'access_token': access_token}), 200
@@ -133,12 +212,12 @@ def refresh():
 def get_current_user():
     """Get current user info."""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
+    user = _load_current_user(user_id)
+
     if not user:
         return jsonify({'error': 'User not found'}), 404
-    
-    return jsonify(user.to_dict()), 200
+
+    return jsonify(user), 200
 
 
 @auth_bp.route('/auth/me', methods=['PATCH'])
@@ -153,20 +232,25 @@ def update_current_user():
     data = request.get_json()
     
     if 'email' in data:
-        existing = User.query.filter_by(email=data['email']).first()
-        if existing and existing.id != user.id:
+        email_taken = db.session.query(
+            User.query.filter(
+                User.email == data['email'], User.id != user.id
+            ).exists()
+        ).scalar()
+        if email_taken:
             return jsonify({'error': 'Email already in use'}), 409
         user.email = data['email']
     
     if 'password' in data:
         if len(data['password']) < 8:
             return jsonify({'error': 'Password must be at least 8 characters'}), 400
-        user.password_hash = bcrypt.hashpw(
-            data['password'].encode('utf-8'),
-            bcrypt.gensalt()
-        ).decode('utf-8')
-    
+        try:
+            user.password_hash = bcrypt_pool.hash(data['password'], rounds=_bcrypt_rounds())
+        except BcryptPoolBusy:
+            return jsonify({'error': 'Server busy, retry shortly'}), 503, {'Retry-After': '1'}
+
     db.session.commit()
+    _invalidate_cached_user(user.id)
     return jsonify(user.to_dict()), 200
 
 
@@ -202,5 +286,6 @@ def update_user_role(user_id):
     
     user.role = data['role']
     db.session.commit()
-    
+    _invalidate_cached_user(user.id)
+
     return jsonify(user.to_dict()), 200
@@ -1,40 +1,98 @@
 """
 Dashboard API - Real-time data and visualizations
 """
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
+from sqlalchemy.orm import defer, raiseload
 
 from ..models import db, Recording, ProcessingJob, MLModel
 from ..services.storage import storage_service
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+# MLModel.to_dict() never reads these large JSON columns, so skip loading
+# them when a model is fetched only to be serialized
+_MODEL_SERIALIZER_OPTIONS = (
+    defer(MLModel.scaler_params),
+    defer(MLModel.cv_results),
+    defer(MLModel.dataset_info)
+)
+
+# Shared pool for presigning batches of URLs; signing is independent per key
+_presign_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='presign')
+
+
+@lru_cache(maxsize=4096)
+def _presigned_cached(object_name, expires_hours, time_bucket):
+    """Memoized presign: deterministic within a half-hour bucket.
+
+    Signing is pure HMAC work on fixed inputs, so within a bucket the result
+    is identical. Half-hour buckets against >=1h expiries guarantee a served
+    URL always has at least 30 minutes of validity left.
+    """
+    return storage_service.get_presigned_url(object_name, expires_hours=expires_hours)
+
+
+def _presign_batch(object_names, expires_hours=1):
+    """Presign several object names concurrently, returning {name: url}."""
+    app = current_app._get_current_object()
+    time_bucket = int(time.time()) // 1800
+
+    def _sign(name):
+        # Worker threads need their own app context for config access
+        with app.app_context():
+            return _presigned_cached(name, expires_hours, time_bucket)
+
+    urls = _presign_executor.map(_sign, object_names)
+    return dict(zip(object_names, urls))
+
 
 @dashboard_bp.route('/dashboard/stats', methods=['GET'])
 @jwt_required(optional=True)
 def get_stats():
     """Get dashboard statistics."""
-    total_recordings = Recording.query.count()
-    processed_recordings = Recording.query.filter_by(status='processed').count()
-    pending_jobs = ProcessingJob.query.filter_by(status='pending').count()
-    running_jobs = ProcessingJob.query.filter_by(status='running').count()
+    # One aggregated scan per table instead of one COUNT query per counter
+    recording_counts = db.session.query(
+        func.count(),
+        func.count().filter(Recording.status == 'processed'),
+        func.count().filter(Recording.status == 'processing'),
+        func.count().filter(Recording.status == 'failed')
+    ).select_from(Recording).one()
+
+    # Bound Python datetime instead of func.current_date(): no date/timestamp
+    # cast in the DB, so the finished_at index stays usable
+    today_utc = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    job_counts = db.session.query(
+        func.count().filter(ProcessingJob.status == 'pending'),
+        func.count().filter(ProcessingJob.status == 'running'),
+        func.count().filter(
+            ProcessingJob.status == 'completed',
+            ProcessingJob.finished_at >= today_utc
+        )
+    ).select_from(ProcessingJob).one()
+
     total_models = MLModel.query.count()
-    production_model = MLModel.query.filter_by(stage='production').first()
-    
+    production_model = MLModel.query.options(
+        *_MODEL_SERIALIZER_OPTIONS
+    ).filter_by(stage='production').first()
+
     return jsonify({
         'recordings': {
-            'total': total_recordings,
-            'processed': processed_recordings,
-            'processing': Recording.query.filter_by(status='processing').count(),
-            'failed': Recording.query.filter_by(status='failed').count()
+            'total': recording_counts[0],
+            'processed': recording_counts[1],
+            'processing': recording_counts[2],
+            'failed': recording_counts[3]
         },
         'jobs': {
-            'pending': pending_jobs,
-            'running': running_jobs,
-            'completed_today': ProcessingJob.query.filter(
-                ProcessingJob.status == 'completed',
-                ProcessingJob.finished_at >= db.func.current_date()
-            ).count()
+            'pending': job_counts[0],
+            'running': job_counts[1],
+            'completed_today': job_counts[2]
         },
         'models': {
             'total': total_models,
@@ -48,8 +106,12 @@ def get_stats():
 def recent_recordings():
     """Get recent recordings."""
     limit = request.args.get('limit', 10, type=int)
-    recordings = Recording.query.order_by(Recording.created_at.desc()).limit(limit).all()
-    
+    # to_dict() reads column attributes only; raiseload keeps it that way so a
+    # future serializer change can't silently reintroduce per-row lazy loads
+    recordings = Recording.query.options(raiseload('*')).order_by(
+        Recording.created_at.desc()
+    ).limit(limit).all()
+
     return jsonify([r.to_dict() for r in recordings]), 200
 
 
@@ -58,8 +120,10 @@ def recent_recordings():
 def recent_jobs():
     """Get recent processing jobs."""
     limit = request.args.get('limit', 10, type=int)
-    jobs = ProcessingJob.query.order_by(ProcessingJob.created_at.desc()).limit(limit).all()
-    
+    jobs = ProcessingJob.query.options(raiseload('*')).order_by(
+        ProcessingJob.created_at.desc()
+    ).limit(limit).all()
+
     return jsonify([j.to_dict() for j in jobs]), 200
 
 
@@ -88,19 +152,25 @@ def get_recording_preview(recording_id):
             'montage': recording.meta.get('montage')
         }
     
-    # Get visualization URLs
+    # Get visualization URLs - one LIST instead of one HEAD per viz type
     viz_types = ['psd_heatmap', 'band_power_violin', 'raw_traces', 'cleaned_traces', 'ica_components']
-    
-    for viz_type in viz_types:
-        viz_path = f"visualizations/{recording_id}/{viz_type}.png"
-        if storage_service.object_exists(viz_path):
-            result['visualizations'][viz_type] = storage_service.get_presigned_url(viz_path, expires_hours=1)
-    
+    existing = storage_service.list_prefix(f"visualizations/{recording_id}/")
+
+    viz_paths = {
+        viz_type: f"visualizations/{recording_id}/{viz_type}.png"
+        for viz_type in viz_types
+        if f"visualizations/{recording_id}/{viz_type}.png" in existing
+    }
+    urls = _presign_batch(list(viz_paths.values()))
+    result['visualizations'] = {
+        viz_type: urls[path] for viz_type, path in viz_paths.items()
+    }
+
     # Get feature summary if available
     if recording.features_path:
         summary_path = f"features/{recording_id}/summary.json"
         try:
-            if storage_service.object_exists(summary_path):
+            if summary_path in storage_service.list_prefix(f"features/{recording_id}/"):
                 import json
                 summary_data = storage_service.download_bytes(summary_path)
                 result['feature_summary'] = json.loads(summary_data)
@@ -114,57 +184,108 @@ def get_recording_preview(recording_id):
 @jwt_required(optional=True)
 def get_model_metrics(model_id):
     """Get detailed metrics for a model."""
-    model = MLModel.query.get_or_404(model_id)
+    model = MLModel.query.options(*_MODEL_SERIALIZER_OPTIONS).get_or_404(model_id)
     
     result = {
         'model': model.to_dict(),
         'plots': {}
     }
     
-    # Get metric plots
+    # Get metric plots - one LIST instead of one HEAD per plot type
     plot_types = ['confusion_matrix', 'roc_curve', 'feature_importance', 'learning_curve']
-    
-    for plot_type in plot_types:
-        plot_path = f"models/{model_id}/eval_plots/{plot_type}.png"
-        if storage_service.object_exists(plot_path):
-            result['plots'][plot_type] = storage_service.get_presigned_url(plot_path, expires_hours=1)
+    existing = storage_service.list_prefix(f"models/{model_id}/eval_plots/")
+
+    plot_paths = {
+        plot_type: f"models/{model_id}/eval_plots/{plot_type}.png"
+        for plot_type in plot_types
+        if f"models/{model_id}/eval_plots/{plot_type}.png" in existing
+    }
+    urls = _presign_batch(list(plot_paths.values()))
+    result['plots'] = {
+        plot_type: urls[path] for plot_type, path in plot_paths.items()
+    }
     
     return jsonify(result), 200
 
 
-@dashboard_bp.route('/dashboard/system/health', methods=['GET'])
-def health_check():
-    """System health check endpoint."""
+# Shared Redis client for health checks - avoids a new TCP connection per call
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.from_url(
+            current_app.config.get('REDIS_URL', 'redis://localhost:6379/0')
+        )
+    return _redis_client
+
+
+# Health result cache - liveness probes from several pods can hit this every
+# couple of seconds; serving a 2s-fresh result keeps backend probe traffic O(1)
+_HEALTH_CACHE_TTL = 2  # seconds
+_health_cache = (0.0, None, None)  # (expiry, payload, status_code)
+
+
+def _run_health_checks():
+    """Probe database, Redis, and MinIO concurrently."""
     health = {
         'status': 'healthy',
         'services': {}
     }
-    
-    # Check database
-    try:
-        db.session.execute(db.text('SELECT 1'))
-        health['services']['database'] = 'healthy'
-    except Exception as e:
-        health['services']['database'] = f'unhealthy: {str(e)}'
-        health['status'] = 'degraded'
-    
-    # Check Redis
-    try:
-        import redis
-        r = redis.from_url(current_app.config.get('REDIS_URL', 'redis://localhost:6379/0'))
-        r.ping()
-        health['services']['redis'] = 'healthy'
-    except Exception as e:
-        health['services']['redis'] = f'unhealthy: {str(e)}'
-        health['status'] = 'degraded'
-    
-    # Check MinIO
-    try:
-        storage_service.client.list_buckets()
-        health['services']['storage'] = 'healthy'
-    except Exception as e:
-        health['services']['storage'] = f'unhealthy: {str(e)}'
-        health['status'] = 'degraded'
-    
+
+    app = current_app._get_current_object()
+
+    def check_database():
+        with app.app_context():
+            db.session.execute(db.text('SELECT 1'))
+
+    def check_redis():
+        with app.app_context():
+            _get_redis().ping()
+
+    def check_storage():
+        with app.app_context():
+            storage_service.client.list_buckets()
+
+    checks = {
+        'database': check_database,
+        'redis': check_redis,
+        'storage': check_storage
+    }
+
+    # The three probes are independent network I/Os - run them concurrently
+    futures = {
+        name: _presign_executor.submit(check) for name, check in checks.items()
+    }
+    for name, future in futures.items():
+        try:
+            future.result(timeout=2)
+            health['services'][name] = 'healthy'
+        except Exception as e:
+            health['services'][name] = f'unhealthy: {str(e)}'
+            health['status'] = 'degraded'
+
     status_code = 200 if health['status'] == 'healthy' else 503
-    return jsonify(health), status_code
+    return health, status_code
+
+
+@dashboard_bp.route('/dashboard/system/health', methods=['GET'])
+def health_check():
+    """System health check endpoint (cached briefly for probe traffic)."""
+    global _health_cache
+
+    expiry, payload, status_code = _health_cache
+    if payload is None or expiry <= time.monotonic():
+        payload, status_code = _run_health_checks()
+        _health_cache = (time.monotonic() + _HEALTH_CACHE_TTL, payload, status_code)
+
+    return jsonify(payload), status_code
+
+
+@dashboard_bp.route('/dashboard/system/health/deep', methods=['GET'])
+def health_check_deep():
+    """Uncached health check for on-demand diagnostics."""
+    payload, status_code = _run_health_checks()
+    return jsonify(payload), status_code
@@ -3,12 +3,11 @@ Ingestion API
  File upload endpoint
  POST /api/ingest
 """
-import os
 import uuid
 import json
-import tempfile
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
 from werkzeug.utils import secure_filename
 
 from ..models import db, Recording, Session, Subject, ProcessingJob
@@ -102,20 +101,10 @@ def ingest_file():
         ext = original_filename.rsplit('.', 1)[1].lower()
         s3_path = f"raw/{subject_id}/{session_id}/{recording_id}.{ext}"
         
-        # Save file temporarily
-        temp_dir = current_app.config.get('TEMP_DIR', tempfile.gettempdir())
-        os.makedirs(temp_dir, exist_ok=True)
-        temp_path = os.path.join(temp_dir, f"{recording_id}.{ext}")
-        
-        file.save(temp_path)
-        
-        # Upload to MinIO
-        storage_service.upload_file(temp_path, s3_path)
-        
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
+        # Stream straight to MinIO - no temp-file round-trip on the web node;
+        # workers stage the file from object storage when they need it on disk
+        storage_service.upload_stream(file.stream, s3_path)
+
         # Add file format and original filename to meta
         meta['filename'] = original_filename
         meta['format'] = file_format
@@ -176,8 +165,13 @@ def validate_file():
 @jwt_required(optional=True)
 def list_subjects():
     """List all subjects."""
-    subjects = Subject.query.order_by(Subject.created_at.desc()).all()
-    return jsonify([s.to_dict() for s in subjects]), 200
+    # Subjects + session counts in one query instead of one COUNT per row
+    rows = db.session.query(
+        Subject, func.count(Session.id)
+    ).outerjoin(
+        Session, Session.subject_id == Subject.id
+    ).group_by(Subject.id).order_by(Subject.created_at.desc()).all()
+    return jsonify([s.to_dict(session_count=count) for s, count in rows]), 200
 
 
 @ingest_bp.route('/subjects', methods=['POST'])
@@ -188,7 +182,9 @@ def create_subject():
     if not data or 'label' not in data:
         return jsonify({'error': 'Subject label required'}), 400
     
-    if Subject.query.filter_by(label=data['label']).first():
+    if db.session.query(
+        Subject.query.filter_by(label=data['label']).exists()
+    ).scalar():
         return jsonify({'error': 'Subject with this label already exists'}), 409
     
     subject = Subject(
@@ -205,9 +201,21 @@ def create_subject():
 @ingest_bp.route('/subjects/<subject_id>/sessions', methods=['GET'])
 @jwt_required(optional=True)
 def list_sessions(subject_id):
-    subject = Subject.query.get_or_404(subject_id)
-    sessions = subject.sessions.order_by(Session.date.desc()).all()
-    return jsonify([s.to_dict() for s in sessions]), 200
+    if not db.session.query(
+        Subject.query.filter_by(id=subject_id).exists()
+    ).scalar():
+        return jsonify({'error': 'Subject not found'}), 404
+
+    # Sessions + recording counts in one query instead of one COUNT per row
+    rows = db.session.query(
+        Session, func.count(Recording.id)
+    ).outerjoin(
+        Recording, Recording.session_id == Session.id
+    ).filter(
+        Session.subject_id == subject_id
+    ).group_by(Session.id).order_by(Session.date.desc()).all()
+
+    return jsonify([s.to_dict(recording_count=count) for s, count in rows]), 200
 
 
 @ingest_bp.route('/subjects/<subject_id>/sessions', methods=['POST'])
@@ -4,15 +4,137 @@ Models API - ML model training, evaluation, and management
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, func, bindparam
+from sqlalchemy.orm import load_only
 
-from ..models import db, MLModel, Recording, ProcessingJob
+from ..models import db, MLModel, Recording, ProcessingJob, AuditLog
 from ..services.storage import storage_service
+from ..tasks.training import train_model_task, load_model_and_predict
+from ..tasks.storage import get_presigned_manifest, invalidate_manifest
+from .etag import conditional_get, etag_for
 
 models_bp = Blueprint('models', __name__)
 
+# Input caps - unbounded ID lists produce IN-list queries the planner
+# refuses to index-scan cleanly, and bloat task payloads
+_MAX_COMPARE_IDS = 50
+_MAX_TRAIN_RECORDINGS = 5000
+
+# Serialized columns matching MLModel.to_dict; list endpoints select these
+# directly instead of hydrating full ORM objects per row
+_MODEL_COLS = (
+    MLModel.id, MLModel.name, MLModel.version, MLModel.model_type,
+    MLModel.pipeline, MLModel.hyperparams, MLModel.metrics,
+    MLModel.feature_names, MLModel.stage, MLModel.s3_path,
+    MLModel.git_commit, MLModel.created_at, MLModel.updated_at
+)
+
+# Compiled once at import; the expanding bindparam takes a variable-length
+# IN-list at execution without recompiling the statement per request
+_COMPARE_MODELS_STMT = select(
+    MLModel.id, MLModel.name, MLModel.model_type,
+    MLModel.stage, MLModel.metrics, MLModel.created_at
+).where(MLModel.id.in_(bindparam('ids', expanding=True)))
+
+# Fan out independent storage I/O (manifest fetch vs. download presign)
+# while the request thread keeps working; mirrors the dashboard executor
+_io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='models-io')
+
+
+def _manifest_in_ctx(app, prefix):
+    with app.app_context():
+        return get_presigned_manifest(prefix)
+
+
+# There is exactly one production model at a time; a Redis pointer makes
+# the hot "current prod" lookup O(1), with the stage index as cold fallback
+_PROD_MODEL_KEY = 'production_model_id'
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.from_url(
+            current_app.config.get('REDIS_URL', 'redis://localhost:6379/0')
+        )
+    return _redis_client
+
+
+def _set_production_pointer(model_id):
+    try:
+        if model_id:
+            _get_redis().set(_PROD_MODEL_KEY, str(model_id))
+        else:
+            _get_redis().delete(_PROD_MODEL_KEY)
+    except Exception:
+        pass
+
+
+def _current_production_model():
+    """Resolve the production model via the Redis pointer.
+
+    Falls back to the stage index when the pointer is cold or stale and
+    refreshes it on the way out.
+    """
+    try:
+        raw = _get_redis().get(_PROD_MODEL_KEY)
+        mid = raw.decode() if raw else None
+    except Exception:
+        mid = None
+
+    if mid:
+        model = db.session.get(MLModel, mid)
+        if model is not None and model.stage == 'production':
+            return model
+
+    model = MLModel.query.filter_by(stage='production').first()
+    _set_production_pointer(model.id if model else None)
+    return model
+
+
+def _list_models_etag():
+    stage = request.args.get('stage')
+    model_type = request.args.get('model_type')
+
+    stmt = select(func.max(MLModel.updated_at), func.count(MLModel.id))
+    if stage:
+        stmt = stmt.where(MLModel.stage == stage)
+    if model_type:
+        stmt = stmt.where(MLModel.model_type == model_type)
+    max_updated, count = db.session.execute(stmt).first()
+
+    return etag_for('models', stage, model_type, request.args.get('limit'),
+                    max_updated, count)
+
+
+def _model_etag(model_id):
+    row = db.session.execute(
+        select(MLModel.updated_at, MLModel.stage)
+        .where(MLModel.id == model_id)
+    ).first()
+    if row is None:
+        return None
+    return etag_for(model_id, row.updated_at.isoformat(), row.stage,
+                    time_bucketed=True)
+
+
+def _production_model_etag():
+    row = db.session.execute(
+        select(MLModel.id, MLModel.updated_at)
+        .where(MLModel.stage == 'production')
+    ).first()
+    if row is None:
+        return None
+    return etag_for(row.id, row.updated_at.isoformat())
+
 
 @models_bp.route('/models', methods=['GET'])
 @jwt_required(optional=True)
+@conditional_get(_list_models_etag)
 def list_models():
     """
     List trained models with optional filtering.
@@ -26,49 +148,59 @@ def list_models():
     model_type = request.args.get('model_type')
     limit = request.args.get('limit', 50, type=int)
     
-    query = MLModel.query
-    
+    stmt = select(*_MODEL_COLS)
+
     if stage:
-        query = query.filter_by(stage=stage)
+        stmt = stmt.where(MLModel.stage == stage)
     if model_type:
-        query = query.filter_by(model_type=model_type)
-    
-    models = query.order_by(MLModel.created_at.desc()).limit(limit).all()
-    
+        stmt = stmt.where(MLModel.model_type == model_type)
+
+    rows = db.session.execute(
+        stmt.order_by(MLModel.created_at.desc()).limit(limit)
+    ).mappings().all()
+
     return jsonify({
-        'models': [m.to_dict() for m in models],
-        'count': len(models)
+        'models': [dict(r) for r in rows],
+        'count': len(rows)
     }), 200
 
 
 @models_bp.route('/models/<model_id>', methods=['GET'])
 @jwt_required(optional=True)
+@conditional_get(_model_etag)
 def get_model(model_id):
     """Get model details including metrics and configuration."""
-    model = MLModel.query.get_or_404(model_id)
+    model = db.session.get(MLModel, model_id)
+    if model is None:
+        return jsonify({'error': 'Model not found'}), 404
     
     result = model.to_dict()
-    
-    # Add presigned URL for model download
+
+    # Kick off the eval-plot manifest fetch (Redis / io queue / inline S3
+    # listing) in parallel with serialization and the download presign
+    plots_prefix = f"models/{model_id}/eval_plots/"
+    manifest_future = _io_executor.submit(
+        _manifest_in_ctx, current_app._get_current_object(), plots_prefix
+    )
+
+    # Add presigned URL for model download - local signing, stays inline
     if model.s3_path:
         try:
-            result['download_url'] = storage_service.get_presigned_url(
-                model.s3_path.replace(f's3://{storage_service.bucket}/', ''),
+            result['download_url'] = storage_service.batch_presigned_get_urls(
+                [model.s3_path.replace(f's3://{storage_service.bucket}/', '')],
                 expires_hours=1
-            )
+            )[0]
         except Exception:
             result['download_url'] = None
-    
-    # Add evaluation plots URLs
-    plots_prefix = f"models/{model_id}/eval_plots/"
+
     try:
-        plot_files = storage_service.list_objects(prefix=plots_prefix)
+        manifest = manifest_future.result()
         result['eval_plots'] = [
             {
                 'name': f.split('/')[-1],
-                'url': storage_service.get_presigned_url(f, expires_hours=1)
+                'url': url
             }
-            for f in plot_files
+            for f, url in zip(manifest['files'], manifest['urls'])
         ]
     except Exception:
         result['eval_plots'] = []
@@ -103,13 +235,22 @@ def train_model():
     if model_type not in ['logistic', 'random_forest']:
         return jsonify({'error': 'Invalid model_type. Use: logistic, random_forest'}), 400
     
-    # If no recording_ids provided, use all recordings with features
+    if len(recording_ids) > _MAX_TRAIN_RECORDINGS:
+        return jsonify({
+            'error': f'At most {_MAX_TRAIN_RECORDINGS} recording_ids allowed'
+        }), 400
+
+    # If no recording_ids provided, use all recordings with features -
+    # IDs only, no ORM hydration
     if not recording_ids:
-        recordings = Recording.query.filter(
-            Recording.features_path.isnot(None)
-        ).all()
-        recording_ids = [str(r.id) for r in recordings]
-    
+        recording_ids = [
+            str(rid) for rid in db.session.execute(
+                select(Recording.id)
+                .where(Recording.features_path.isnot(None))
+                .limit(_MAX_TRAIN_RECORDINGS)
+            ).scalars()
+        ]
+
     if len(recording_ids) < 2:
         return jsonify({'error': 'At least 2 recordings with features required'}), 400
     
@@ -129,7 +270,6 @@ def train_model():
     db.session.commit()
     
     # Enqueue training task
-    from ..tasks.training import train_model_task
     task = train_model_task.delay(str(model.id), recording_ids, model_type, params, labels)
     
     return jsonify({
@@ -150,7 +290,12 @@ def promote_model(model_id):
     Body:
         - stage: 'candidate' or 'production'
     """
-    model = MLModel.query.get_or_404(model_id)
+    # Only stage and metrics are read; skip the other JSON columns
+    model = db.session.get(MLModel, model_id, options=[
+        load_only(MLModel.id, MLModel.stage, MLModel.metrics)
+    ])
+    if model is None:
+        return jsonify({'error': 'Model not found'}), 404
     data = request.get_json() or {}
     
     new_stage = data.get('stage', 'candidate')
@@ -158,36 +303,41 @@ def promote_model(model_id):
     if new_stage not in ['candidate', 'production']:
         return jsonify({'error': 'Invalid stage'}), 400
     
-    # Check promotion thresholds
-    config = current_app.config.get('PROCESSING_CONFIG', {})
-    thresholds = config.get('training', {}).get('promotion_thresholds', {})
-    
+    # Check promotion thresholds (resolved once at startup)
+    roc_min, f1_min = current_app.config['PROMOTION_THRESHOLDS']
+
     metrics = model.metrics or {}
-    
+
     if new_stage == 'production':
         roc_auc = metrics.get('roc_auc', 0)
         f1 = metrics.get('f1', 0)
-        
-        if roc_auc < thresholds.get('roc_auc', 0.75):
+
+        if roc_auc < roc_min:
             return jsonify({
-                'error': f'ROC AUC ({roc_auc:.3f}) below threshold ({thresholds.get("roc_auc", 0.75)})'
+                'error': f'ROC AUC ({roc_auc:.3f}) below threshold ({roc_min})'
             }), 400
-        
-        if f1 < thresholds.get('f1', 0.65):
+
+        if f1 < f1_min:
             return jsonify({
-                'error': f'F1 score ({f1:.3f}) below threshold ({thresholds.get("f1", 0.65)})'
+                'error': f'F1 score ({f1:.3f}) below threshold ({f1_min})'
             }), 400
         
         # Demote current production model
-        current_prod = MLModel.query.filter_by(stage='production').first()
+        current_prod = _current_production_model()
         if current_prod and current_prod.id != model.id:
             current_prod.stage = 'candidate'
-    
+
+    was_production = model.stage == 'production'
     model.stage = new_stage
     db.session.commit()
+
+    # Keep the O(1) production pointer in step with the committed stage
+    if new_stage == 'production':
+        _set_production_pointer(model.id)
+    elif was_production:
+        _set_production_pointer(None)
     
     # Log audit
-    from ..models import AuditLog
     audit = AuditLog(
         action='model_promotion',
         resource_type='model',
@@ -208,16 +358,25 @@ def promote_model(model_id):
 @jwt_required(optional=True)
 def delete_model(model_id):
     """Delete a model."""
-    model = MLModel.query.get_or_404(model_id)
+    model = db.session.get(MLModel, model_id, options=[
+        load_only(MLModel.id, MLModel.stage, MLModel.s3_path)
+    ])
+    if model is None:
+        return jsonify({'error': 'Model not found'}), 404
     
     if model.stage == 'production':
         return jsonify({'error': 'Cannot delete production model'}), 400
     
-    # Delete from S3
+    # Delete model file and evaluation plots in one DeleteObjects call
+    plots_prefix = f"models/{model_id}/eval_plots/"
     try:
+        obj_names = storage_service.list_objects(prefix=plots_prefix)
         if model.s3_path:
-            obj_name = model.s3_path.replace(f's3://{storage_service.bucket}/', '')
-            storage_service.delete_file(obj_name)
+            obj_names.append(
+                model.s3_path.replace(f's3://{storage_service.bucket}/', '')
+            )
+        storage_service.delete_files(obj_names)
+        invalidate_manifest(plots_prefix)
     except Exception as e:
         current_app.logger.warning(f"Error deleting model file: {e}")
     
@@ -237,7 +396,11 @@ def predict(model_id):
         - recording_id: Recording to predict on
         - features: Raw feature vector (alternative to recording_id)
     """
-    model = MLModel.query.get_or_404(model_id)
+    # Existence check only - load_model_and_predict fetches what it needs
+    if not db.session.query(
+        MLModel.query.filter_by(id=model_id).exists()
+    ).scalar():
+        return jsonify({'error': 'Model not found'}), 404
     data = request.get_json()
     
     if not data:
@@ -250,8 +413,6 @@ def predict(model_id):
         return jsonify({'error': 'recording_id or features required'}), 400
     
     # Load model and predict
-    from ..tasks.training import load_model_and_predict
-    
     try:
         result = load_model_and_predict(model_id, recording_id, features)
         return jsonify(result), 200
@@ -261,10 +422,11 @@ def predict(model_id):
 
 @models_bp.route('/models/production', methods=['GET'])
 @jwt_required(optional=True)
+@conditional_get(_production_model_etag)
 def get_production_model():
     """Get the current production model."""
-    model = MLModel.query.filter_by(stage='production').first()
-    
+    model = _current_production_model()
+
     if not model:
         return jsonify({'error': 'No production model available'}), 404
     
@@ -285,19 +447,17 @@ def compare_models():
     
     if len(model_ids) < 2:
         return jsonify({'error': 'At least 2 model IDs required'}), 400
-    
-    models = MLModel.query.filter(MLModel.id.in_(model_ids)).all()
-    
-    comparison = []
-    for m in models:
-        comparison.append({
-            'id': str(m.id),
-            'name': m.name,
-            'model_type': m.model_type,
-            'stage': m.stage,
-            'metrics': m.metrics,
-            'created_at': m.created_at.isoformat()
-        })
+
+    if len(model_ids) > _MAX_COMPARE_IDS:
+        return jsonify({
+            'error': f'At most {_MAX_COMPARE_IDS} model_ids allowed'
+        }), 400
+
+    rows = db.session.execute(
+        _COMPARE_MODELS_STMT, {'ids': model_ids}
+    ).mappings().all()
+
+    comparison = [dict(r) for r in rows]
     
     return jsonify({
         'models': comparison,
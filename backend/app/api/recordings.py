@@ -1,18 +1,107 @@
 """
 Recordings API - Recording management and processing
 """
-from flask import Blueprint, request, jsonify, current_app
+import orjson
+from flask import (Blueprint, request, jsonify, current_app, Response,
+                   stream_with_context)
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy import select, func, update
+from sqlalchemy.orm import load_only
 
-from ..models import db, Recording, ProcessingJob, Session
+from ..models import db, Recording, ProcessingJob, Session, generate_uuid
 from ..services.storage import storage_service
+from ..celery_worker import celery
+from ..tasks.preprocessing import preprocess_recording
+from ..tasks.features import extract_features_task
+from ..tasks.storage import get_presigned_manifest, invalidate_manifest
+from .etag import conditional_get, etag_for
 
 recordings_bp = Blueprint('recordings', __name__)
 
+_VIZ_LIST_MAX_KEYS = 100
+
+# Above this page size the listing is streamed row by row instead of
+# materializing one large response string
+_STREAM_THRESHOLD = 500
+
+
+def _stream_recordings(result, total, limit, offset):
+    """Stream a recordings page as JSON with O(1 row) peak memory."""
+    def generate():
+        yield b'{"recordings":['
+        first = True
+        for row in result:
+            if not first:
+                yield b','
+            first = False
+            yield orjson.dumps(dict(row), default=str)
+        yield (b'],"total":%d,"limit":%d,"offset":%d}'
+               % (total, limit, offset))
+
+    return Response(stream_with_context(generate()),
+                    mimetype='application/json')
+
+
+def _invalidate_viz_listing(recording_id):
+    invalidate_manifest(f"visualizations/{recording_id}/")
+
+
+# Serialized columns, mirroring Recording.to_dict / ProcessingJob.to_dict.
+# List endpoints select these directly so rows skip ORM hydration entirely.
+_RECORDING_COLS = (
+    Recording.id, Recording.session_id, Recording.filename, Recording.sfreq,
+    Recording.channels, Recording.duration_sec, Recording.status,
+    Recording.s3_path, Recording.processed_path, Recording.features_path,
+    Recording.meta, Recording.created_at, Recording.updated_at
+)
+
+_JOB_COLS = (
+    ProcessingJob.id, ProcessingJob.recording_id, ProcessingJob.step,
+    ProcessingJob.params, ProcessingJob.status, ProcessingJob.progress,
+    ProcessingJob.log, ProcessingJob.error, ProcessingJob.celery_task_id,
+    ProcessingJob.started_at, ProcessingJob.finished_at, ProcessingJob.created_at
+)
+
+
+def _list_recordings_etag():
+    status = request.args.get('status')
+    session_id = request.args.get('session_id')
+
+    stmt = select(func.max(Recording.updated_at), func.count(Recording.id))
+    if status:
+        stmt = stmt.where(Recording.status == status)
+    if session_id:
+        stmt = stmt.where(Recording.session_id == session_id)
+    max_updated, count = db.session.execute(stmt).first()
+
+    return etag_for('recordings', status, session_id,
+                    request.args.get('limit'), request.args.get('offset'),
+                    max_updated, count)
+
+
+def _recording_etag(recording_id):
+    row = db.session.execute(
+        select(Recording.updated_at, Recording.status)
+        .where(Recording.id == recording_id)
+    ).first()
+    if row is None:
+        return None
+
+    # Job progress moves without touching the recording row, so fold in a
+    # cheap aggregate over the recording's jobs
+    job_count, jobs_progress = db.session.execute(
+        select(func.count(ProcessingJob.id), func.sum(ProcessingJob.progress))
+        .where(ProcessingJob.recording_id == recording_id)
+    ).first()
+
+    return etag_for(recording_id, row.updated_at.isoformat(), row.status,
+                    job_count, jobs_progress, time_bucketed=True)
+
 
 @recordings_bp.route('/recordings', methods=['GET'])
 @jwt_required(optional=True)
+@conditional_get(_list_recordings_etag)
 def list_recordings():
     status = request.args.get('status')
     session_id = request.args.get('session_id')
@@ -20,17 +109,30 @@ def list_recordings():
     offset = request.args.get('offset', 0, type=int)
     
     query = Recording.query
-    
+
     if status:
         query = query.filter_by(status=status)
     if session_id:
         query = query.filter_by(session_id=session_id)
-    
+
     total = query.count()
-    recordings = query.order_by(Recording.created_at.desc()).offset(offset).limit(limit).all()
-    
+
+    stmt = select(*_RECORDING_COLS)
+    if status:
+        stmt = stmt.where(Recording.status == status)
+    if session_id:
+        stmt = stmt.where(Recording.session_id == session_id)
+    stmt = stmt.order_by(Recording.created_at.desc()).offset(offset).limit(limit)
+
+    result = db.session.execute(stmt).mappings()
+
+    if limit >= _STREAM_THRESHOLD:
+        return _stream_recordings(result, total, limit, offset)
+
+    rows = result.all()
+
     return jsonify({
-        'recordings': [r.to_dict() for r in recordings],
+        'recordings': [dict(r) for r in rows],
         'total': total,
         'limit': limit,
         'offset': offset
@@ -39,41 +141,49 @@ def list_recordings():
 
 @recordings_bp.route('/recordings/<recording_id>', methods=['GET'])
 @jwt_required(optional=True)
+@conditional_get(_recording_etag)
 def get_recording(recording_id):
-    recording = Recording.query.get_or_404(recording_id)
-    
-    # Get associated processing jobs
-    jobs = recording.processing_jobs.order_by(ProcessingJob.created_at.desc()).all()
-    
+    recording = db.session.get(Recording, recording_id)
+    if recording is None:
+        return jsonify({'error': 'Recording not found'}), 404
+
+    # Get associated processing jobs without hydrating ORM objects
+    jobs = db.session.execute(
+        select(*_JOB_COLS).where(
+            ProcessingJob.recording_id == recording_id
+        ).order_by(ProcessingJob.created_at.desc())
+    ).mappings().all()
+
     result = recording.to_dict()
-    result['processing_jobs'] = [j.to_dict() for j in jobs]
+    result['processing_jobs'] = [dict(j) for j in jobs]
     
-    # Add presigned URLs for file downloads if available
+    # Add presigned URLs for file downloads if available - signed as one batch
+    url_fields = {}
     if recording.s3_path:
-        try:
-            result['raw_url'] = storage_service.get_presigned_url(
-                recording.s3_path.replace(f's3://{storage_service.bucket}/', ''),
-                expires_hours=1
-            )
-        except Exception:
-            result['raw_url'] = None
-    
+        url_fields['raw_url'] = recording.s3_path.replace(
+            f's3://{storage_service.bucket}/', '')
     if recording.processed_path:
+        url_fields['processed_url'] = recording.processed_path.replace(
+            f's3://{storage_service.bucket}/', '')
+
+    if url_fields:
         try:
-            result['processed_url'] = storage_service.get_presigned_url(
-                recording.processed_path.replace(f's3://{storage_service.bucket}/', ''),
-                expires_hours=1
+            urls = storage_service.batch_presigned_get_urls(
+                list(url_fields.values()), expires_hours=1
             )
+            result.update(zip(url_fields.keys(), urls))
         except Exception:
-            result['processed_url'] = None
-    
+            result.update({field: None for field in url_fields})
+
     return jsonify(result), 200
 
 
 @recordings_bp.route('/recordings/<recording_id>', methods=['PATCH'])
 @jwt_required(optional=True)
 def update_recording(recording_id):
-    recording = Recording.query.get_or_404(recording_id)
+    recording = db.session.get(Recording, recording_id)
+    if recording is None:
+        return jsonify({'error': 'Recording not found'}), 404
     data = request.get_json()
     
     if 'meta' in data:
@@ -82,8 +192,9 @@ def update_recording(recording_id):
     
     if 'status' in data:
         recording.status = data['status']
-    
+
     db.session.commit()
+    _invalidate_viz_listing(recording_id)
     return jsonify(recording.to_dict()), 200
 
 
@@ -91,35 +202,43 @@ def update_recording(recording_id):
 @jwt_required(optional=True)
 def delete_recording(recording_id):
     """Delete a recording and its associated files."""
-    recording = Recording.query.get_or_404(recording_id)
-    
-    # Delete from S3
+    # Only the object-path columns matter here; skip hydrating meta JSON
+    recording = db.session.get(Recording, recording_id, options=[
+        load_only(Recording.id, Recording.s3_path,
+                  Recording.processed_path, Recording.features_path)
+    ])
+    if recording is None:
+        return jsonify({'error': 'Recording not found'}), 404
+    
+    # Delete from S3 - one DeleteObjects call instead of three round-trips
+    bucket_prefix = f's3://{storage_service.bucket}/'
+    obj_names = [
+        path.replace(bucket_prefix, '')
+        for path in (recording.s3_path, recording.processed_path,
+                     recording.features_path)
+        if path
+    ]
     try:
-        if recording.s3_path:
-            obj_name = recording.s3_path.replace(f's3://{storage_service.bucket}/', '')
-            storage_service.delete_file(obj_name)
-        
-        if recording.processed_path:
-            obj_name = recording.processed_path.replace(f's3://{storage_service.bucket}/', '')
-            storage_service.delete_file(obj_name)
-        
-        if recording.features_path:
-            obj_name = recording.features_path.replace(f's3://{storage_service.bucket}/', '')
-            storage_service.delete_file(obj_name)
+        storage_service.delete_files(obj_names)
     except Exception as e:
         current_app.logger.warning(f"Error deleting S3 files: {e}")
     
     # Delete from database
     db.session.delete(recording)
     db.session.commit()
-    
+    _invalidate_viz_listing(recording_id)
+
     return jsonify({'message': 'Recording deleted'}), 200
 
 
 @recordings_bp.route('/recordings/<recording_id>/start_preprocess', methods=['POST'])
 @jwt_required(optional=True)
 def start_preprocessing(recording_id):
-    recording = Recording.query.get_or_404(recording_id)
+    recording = db.session.get(Recording, recording_id, options=[
+        load_only(Recording.id, Recording.status)
+    ])
+    if recording is None:
+        return jsonify({'error': 'Recording not found'}), 404
     
     if recording.status not in ['uploaded', 'failed', 'needs_review']:
         return jsonify({
@@ -128,32 +247,34 @@ def start_preprocessing(recording_id):
     
     data = request.get_json() or {}
     params = data.get('params', {})
-    
-    # Create processing job
+
+    # Pre-assign job and Celery task IDs client-side so a single commit
+    # covers job creation and dispatch metadata (no second UPDATE)
+    job_id = generate_uuid()
+    task_id = generate_uuid()
     job = ProcessingJob(
+        id=job_id,
         recording_id=recording.id,
         step='preprocessing',
         params=params,
-        status='pending'
+        status='pending',
+        celery_task_id=task_id
     )
     db.session.add(job)
-    
+
     # Update recording status
     recording.status = 'processing'
     db.session.commit()
-    
-    # Enqueue Celery task
-    from ..tasks.preprocessing import preprocess_recording
-    task = preprocess_recording.delay(str(recording.id), str(job.id))
-    
-    # update job with Celery task ID
-    job.celery_task_id = task.id
-    db.session.commit()
-    
+
+    # Enqueue Celery task with the pre-assigned ID
+    preprocess_recording.apply_async(
+        args=(recording_id, job_id), task_id=task_id
+    )
+
     return jsonify({
-        'job_id': str(job.id),
+        'job_id': job_id,
         'recording_id': recording_id,
-        'celery_task_id': task.id,
+        'celery_task_id': task_id,
         'status': 'pending'
     }), 202
 
@@ -164,7 +285,11 @@ def extract_features(recording_id):
     """
     Start feature extraction job for a processed recording.
     """
-    recording = Recording.query.get_or_404(recording_id)
+    recording = db.session.get(Recording, recording_id, options=[
+        load_only(Recording.id, Recording.status)
+    ])
+    if recording is None:
+        return jsonify({'error': 'Recording not found'}), 404
     
     if recording.status != 'processed':
         return jsonify({
@@ -173,28 +298,30 @@ def extract_features(recording_id):
     
     data = request.get_json() or {}
     params = data.get('params', {})
-    
-    # Create processing job
+
+    # Pre-assigned IDs: one commit covers creation and dispatch metadata
+    job_id = generate_uuid()
+    task_id = generate_uuid()
     job = ProcessingJob(
+        id=job_id,
         recording_id=recording.id,
         step='feature_extraction',
         params=params,
-        status='pending'
+        status='pending',
+        celery_task_id=task_id
     )
     db.session.add(job)
     db.session.commit()
-    
-    # Enqueue Celery task
-    from ..tasks.features import extract_features_task
-    task = extract_features_task.delay(str(recording.id), str(job.id))
-    
-    job.celery_task_id = task.id
-    db.session.commit()
-    
+
+    # Enqueue Celery task with the pre-assigned ID
+    extract_features_task.apply_async(
+        args=(recording_id, job_id), task_id=task_id
+    )
+
     return jsonify({
-        'job_id': str(job.id),
+        'job_id': job_id,
         'recording_id': recording_id,
-        'celery_task_id': task.id,
+        'celery_task_id': task_id,
         'status': 'pending'
     }), 202
 
@@ -203,12 +330,20 @@ def extract_features(recording_id):
 @jwt_required(optional=True)
 def get_recording_jobs(recording_id):
     """Get all processing jobs for a recording."""
-    recording = Recording.query.get_or_404(recording_id)
-    jobs = recording.processing_jobs.order_by(ProcessingJob.created_at.desc()).all()
-    
+    if not db.session.query(
+        Recording.query.filter_by(id=recording_id).exists()
+    ).scalar():
+        return jsonify({'error': 'Recording not found'}), 404
+
+    jobs = db.session.execute(
+        select(*_JOB_COLS).where(
+            ProcessingJob.recording_id == recording_id
+        ).order_by(ProcessingJob.created_at.desc())
+    ).mappings().all()
+
     return jsonify({
         'recording_id': recording_id,
-        'jobs': [j.to_dict() for j in jobs]
+        'jobs': [dict(j) for j in jobs]
     }), 200
 
 
@@ -216,7 +351,9 @@ def get_recording_jobs(recording_id):
 @jwt_required(optional=True)
 def get_job(job_id):
     """Get processing job details."""
-    job = ProcessingJob.query.get_or_404(job_id)
+    job = db.session.get(ProcessingJob, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
     return jsonify(job.to_dict()), 200
 
 
@@ -224,43 +361,73 @@ def get_job(job_id):
 @jwt_required(optional=True)
 def cancel_job(job_id):
     """Cancel a running job."""
-    job = ProcessingJob.query.get_or_404(job_id)
-    
-    if job.status not in ['pending', 'running']:
+    # Single conditional UPDATE: atomic under concurrent cancels, one
+    # round-trip instead of SELECT + status check + UPDATE
+    row = db.session.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id,
+               ProcessingJob.status.in_(['pending', 'running']))
+        .values(status='cancelled', finished_at=datetime.utcnow())
+        .returning(ProcessingJob.celery_task_id)
+    ).first()
+
+    if row is None:
+        db.session.rollback()
+        if not db.session.query(
+            ProcessingJob.query.filter_by(id=job_id).exists()
+        ).scalar():
+            return jsonify({'error': 'Job not found'}), 404
         return jsonify({'error': 'Job cannot be cancelled'}), 400
-    
-    # Revoke Celery task
-    if job.celery_task_id:
-        from ..extensions import celery_app
-        celery_app.control.revoke(job.celery_task_id, terminate=True)
-    
-    job.status = 'cancelled'
-    job.finished_at = datetime.utcnow()
+
     db.session.commit()
-    
+
+    # Revoke Celery task
+    if row.celery_task_id:
+        celery.control.revoke(row.celery_task_id, terminate=True)
+
     return jsonify({'message': 'Job cancelled', 'job_id': job_id}), 200
 
 
 @recordings_bp.route('/recordings/<recording_id>/visualizations', methods=['GET'])
 @jwt_required(optional=True)
 def get_visualizations(recording_id):
-    """Get available visualizations for a recording."""
-    recording = Recording.query.get_or_404(recording_id)
-    
-    # List visualization files in S3
-    viz_prefix = f"visualizations/{recording_id}/"
-    
+    """Get available visualizations for a recording.
+
+    Query params:
+        - type: Only return this visualization type (filename stem)
+    """
+    # Existence check only - no column hydration needed
+    if not db.session.query(
+        Recording.query.filter_by(id=recording_id).exists()
+    ).scalar():
+        return jsonify({'error': 'Recording not found'}), 404
+    viz_type = request.args.get('type')
+
     try:
-        viz_files = storage_service.list_objects(prefix=viz_prefix)
-        
-        visualizations = []
-        for f in viz_files:
-            viz_type = f.split('/')[-1].rsplit('.', 1)[0]
-            visualizations.append({
-                'type': viz_type,
+        if viz_type:
+            # Narrow prefix walk: type is the filename stem, so it extends
+            # the key prefix directly
+            viz_files = storage_service.list_objects(
+                prefix=f"visualizations/{recording_id}/{viz_type}",
+                max_keys=_VIZ_LIST_MAX_KEYS
+            )
+            urls = storage_service.batch_presigned_get_urls(
+                viz_files, expires_hours=1
+            )
+        else:
+            # Enumerate + sign runs on the io queue (or the first caller
+            # inline); repeat polls are served from the Redis manifest
+            manifest = get_presigned_manifest(f"visualizations/{recording_id}/")
+            viz_files, urls = manifest['files'], manifest['urls']
+
+        visualizations = [
+            {
+                'type': f.split('/')[-1].rsplit('.', 1)[0],
                 'path': f,
-                'url': storage_service.get_presigned_url(f, expires_hours=1)
-            })
+                'url': url
+            }
+            for f, url in zip(viz_files, urls)
+        ]
         
         return jsonify({
             'recording_id': recording_id,
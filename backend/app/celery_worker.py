@@ -1,5 +1,6 @@
 # Celery worker initialization
 from celery import Celery
+from celery.signals import worker_process_init
 import os
 
 # Create Celery app
@@ -11,26 +12,42 @@ celery = Celery(
         'app.tasks.preprocessing',
         'app.tasks.features',
         'app.tasks.training',
-        'app.tasks.realtime'
+        'app.tasks.realtime',
+        'app.tasks.storage'
     ]
 )
 
 # Celery configuration
 celery.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    # msgpack: compact binary payloads - recording_id lists and param dicts
+    # cost less broker memory and serialization CPU than JSON. json stays
+    # accepted so in-flight tasks survive a rolling deploy.
+    task_serializer='msgpack',
+    accept_content=['msgpack', 'json'],
+    result_serializer='msgpack',
     timezone='UTC',
     enable_utc=True,
     task_track_started=True,
     task_time_limit=3600,  # 1 hour max
     task_soft_time_limit=3000,  # Soft limit 50 min
     worker_prefetch_multiplier=1,  # One task at a time for heavy processing
+    task_acks_late=True,  # Re-deliver if a worker dies mid-task
+    task_reject_on_worker_lost=True,
+    worker_max_tasks_per_child=50,  # Recycle workers: MNE/sklearn fragment memory
+    worker_max_memory_per_child=2_000_000,  # KB
+    task_annotations={
+        # Keep heavy preprocessing from monopolizing broker throughput.
+        # Annotations match exact task names only (globs are not expanded
+        # here, unlike task_routes); batch dispatch is not limited since
+        # it only fans out to the rate-limited per-recording task.
+        'app.tasks.preprocessing.preprocess_recording': {'rate_limit': '30/m'},
+    },
     task_routes={
         'app.tasks.preprocessing.*': {'queue': 'preprocessing'},
         'app.tasks.features.*': {'queue': 'preprocessing'},
         'app.tasks.training.*': {'queue': 'training'},
         'app.tasks.realtime.*': {'queue': 'realtime'},
+        'app.tasks.storage.*': {'queue': 'io'},
     },
     beat_schedule={
         'check-auto-retrain': {
@@ -41,10 +58,27 @@ celery.conf.update(
 )
 
 
+@worker_process_init.connect
+def _prewarm_scratch_pool(**kwargs):
+    """Pre-create pooled scratch dirs so the first tasks skip mkdtemp."""
+    from app.services import scratch_pool
+    scratch_pool.prewarm()
+
+
 def init_celery(app):
     """Initialize Celery with Flask app context"""
-    celery.conf.update(app.config)
-    
+    # Map the Flask-style CELERY_* keys onto new-style names explicitly;
+    # dumping app.config wholesale would mix old and new setting formats
+    celery.conf.update(
+        broker_url=app.config.get('CELERY_BROKER_URL'),
+        result_backend=app.config.get('CELERY_RESULT_BACKEND'),
+        task_serializer=app.config.get('CELERY_TASK_SERIALIZER', 'json'),
+        result_serializer=app.config.get('CELERY_RESULT_SERIALIZER', 'json'),
+        accept_content=app.config.get('CELERY_ACCEPT_CONTENT', ['json']),
+        timezone=app.config.get('CELERY_TIMEZONE', 'UTC'),
+        task_track_started=app.config.get('CELERY_TASK_TRACK_STARTED', True),
+    )
+
     class ContextTask(celery.Task):
         def __call__(self, *args, **kwargs):
             with app.app_context():
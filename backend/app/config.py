@@ -19,6 +19,21 @@ class Config:
         'sqlite:///neurolab.db'
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Engine pool sized for Postgres (ideally fronted by PgBouncer); pre-ping
+    # and recycle keep idle-timeout'd connections from failing the first
+    # request after a lull. SQLite dev/test keeps library defaults.
+    if SQLALCHEMY_DATABASE_URI.startswith('postgresql'):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_size': 20,
+            'max_overflow': 10,
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,
+            'connect_args': {'application_name': 'neurolab-api'},
+        }
+
+    # Create tables at startup (dev/test only; production uses flask db upgrade)
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'True').lower() == 'true'
     
     # Redis
     REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
@@ -26,9 +41,9 @@ class Config:
     # Celery
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
     CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
-    CELERY_TASK_SERIALIZER = 'json'
-    CELERY_RESULT_SERIALIZER = 'json'
-    CELERY_ACCEPT_CONTENT = ['json']
+    CELERY_TASK_SERIALIZER = 'msgpack'
+    CELERY_RESULT_SERIALIZER = 'msgpack'
+    CELERY_ACCEPT_CONTENT = ['msgpack', 'json']
     CELERY_TIMEZONE = 'UTC'
     CELERY_TASK_TRACK_STARTED = True
     
@@ -38,7 +53,17 @@ class Config:
     MINIO_SECRET_KEY = os.environ.get('MINIO_SECRET_KEY', 'minioadmin')
     MINIO_BUCKET = os.environ.get('MINIO_BUCKET', 'neurolab')
     MINIO_SECURE = os.environ.get('MINIO_SECURE', 'False').lower() == 'true'
+    MINIO_REGION = os.environ.get('MINIO_REGION', 'us-east-1')
     
+    # Password hashing - bcrypt cost factor (work doubles per +1 round)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
+    # Rate limiting - caps bcrypt CPU an attacker can consume via login/register
+    RATELIMIT_STORAGE_URI = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = True
+    RATELIMIT_SWALLOW_ERRORS = True
+    AUTH_RATE_LIMIT = os.environ.get('AUTH_RATE_LIMIT', '5 per minute; 20 per hour')
+
     # JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
@@ -109,6 +134,7 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    AUTO_CREATE_TABLES = False
     # NOTE: Require all secrets to be set from environment
     @property
     def SECRET_KEY(self):
@@ -117,10 +143,21 @@ class ProductionConfig(Config):
             raise ValueError("SECRET_KEY must be set in production")
         return key
 
+    # SQLite serializes all writes; production must point at Postgres
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        uri = os.environ.get('DATABASE_URL', '')
+        if not uri.startswith('postgresql'):
+            raise ValueError(
+                "DATABASE_URL must be a postgresql:// URI in production"
+            )
+        return uri
+
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    RATELIMIT_ENABLED = False
 
 
 config_by_name = {
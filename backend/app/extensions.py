@@ -3,28 +3,15 @@ Flask extensions initialization
 """
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from celery import Celery
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+
+# Single Celery instance - web process and worker share broker, routes, and
+# config, so control operations (revoke) land where tasks actually run
+from .celery_worker import celery as celery_app
 
 db = SQLAlchemy()
 migrate = Migrate()
 
-# Initialize Celery
-celery_app = Celery(
-    'neurolab',
-    broker='redis://localhost:6379/0',
-    backend='redis://localhost:6379/0'
-)
-
-celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
-    timezone='UTC',
-    enable_utc=True,
-    task_track_started=True,
-    task_routes={
-        'app.tasks.preprocessing.*': {'queue': 'preprocessing'},
-        'app.tasks.training.*': {'queue': 'training'},
-        'app.tasks.realtime.*': {'queue': 'realtime'},
-    }
-)
+# Rate limiter - storage backend configured from app config in create_app
+limiter = Limiter(key_func=get_remote_address)
@@ -1,14 +1,41 @@
 """
 Database models for NeuroLab
 """
-import uuid
+import random
+import time
 from datetime import datetime
-from sqlalchemy import JSON, String
+from sqlalchemy import JSON as _JSON, String
+from sqlalchemy.dialects.postgresql import JSONB
 from .extensions import db
 
+# JSONB on Postgres (binary storage, containment operators, GIN-indexable);
+# plain JSON everywhere else (SQLite dev/test)
+JSON = _JSON().with_variant(JSONB(), 'postgresql')
+
+# os.urandom-backed, so ids stay unguessable like uuid4 but skip the
+# UUID object construction/validation that str(uuid.uuid4()) pays per row
+_getrandbits = random.SystemRandom().getrandbits
+
 
 def generate_uuid():
-    return str(uuid.uuid4())
+    """
+    Dash-formatted UUIDv7 string (time-ordered, String(36)).
+
+    The leading 48 bits are the unix millisecond timestamp, so ids
+    generated over time sort near-monotonically and PK B-tree inserts
+    stay append-like instead of splitting random pages.
+    """
+    ts_ms = time.time_ns() // 1_000_000
+    rand = _getrandbits(74)
+    value = (
+        (ts_ms << 80)
+        | (0x7 << 76)                       # version 7
+        | ((rand >> 62) << 64)              # rand_a (12 bits)
+        | (0x2 << 62)                       # RFC 4122 variant
+        | (rand & ((1 << 62) - 1))          # rand_b (62 bits)
+    )
+    b = value.to_bytes(16, 'big')
+    return f"{b[:4].hex()}-{b[4:6].hex()}-{b[6:8].hex()}-{b[8:10].hex()}-{b[10:].hex()}"
 
 
 class Subject(db.Model):
@@ -25,14 +52,17 @@ class Subject(db.Model):
     # Relationships
     sessions = db.relationship('Session', backref='subject', lazy='dynamic', cascade='all, delete-orphan')
     
-    def to_dict(self):
+    def to_dict(self, session_count=None):
         return {
-            'id': str(self.id),
+            'id': self.id,
             'label': self.label,
-            'dob': self.dob.isoformat() if self.dob else None,
+            'dob': self.dob,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat(),
-            'session_count': self.sessions.count()
+            'created_at': self.created_at,
+            # Callers serializing many subjects pass a precomputed count to
+            # avoid one COUNT query per row
+            'session_count': session_count if session_count is not None
+                             else self.sessions.count()
         }
 
 
@@ -50,21 +80,35 @@ class Session(db.Model):
     # relationships
     recordings = db.relationship('Recording', backref='session', lazy='dynamic', cascade='all, delete-orphan')
     
-    def to_dict(self):
+    def to_dict(self, recording_count=None):
         return {
-            'id': str(self.id),
-            'subject_id': str(self.subject_id),
-            'date': self.date.isoformat(),
+            'id': self.id,
+            'subject_id': self.subject_id,
+            'date': self.date,
             'protocol': self.protocol,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat(),
-            'recording_count': self.recordings.count()
+            'created_at': self.created_at,
+            # Callers serializing many sessions pass a precomputed count to
+            # avoid one COUNT query per row
+            'recording_count': recording_count if recording_count is not None
+                               else self.recordings.count()
         }
 
 
 class Recording(db.Model):
     __tablename__ = 'recordings'
-    
+    # Listing filters by status or session and orders by created_at DESC;
+    # composite indexes keep those as index range scans reading only `limit` rows
+    __table_args__ = (
+        db.Index('ix_recordings_status_created_at', 'status', 'created_at'),
+        db.Index('ix_recordings_session_created_at', 'session_id', 'created_at'),
+        # GIN index for meta containment filters (e.g. device/montage);
+        # jsonb_path_ops keeps it several times smaller than full jsonb_ops
+        db.Index('ix_recordings_meta_gin', 'meta',
+                 postgresql_using='gin',
+                 postgresql_ops={'meta': 'jsonb_path_ops'}),
+    )
+
     id = db.Column(String(36), primary_key=True, default=generate_uuid)
     session_id = db.Column(String(36), db.ForeignKey('sessions.id'), nullable=False)
     filename = db.Column(db.String(500), nullable=False)
@@ -84,8 +128,8 @@ class Recording(db.Model):
     
     def to_dict(self):
         return {
-            'id': str(self.id),
-            'session_id': str(self.session_id),
+            'id': self.id,
+            'session_id': self.session_id,
             'filename': self.filename,
             'sfreq': self.sfreq,
             'channels': self.channels,
@@ -95,15 +139,23 @@ class Recording(db.Model):
             'processed_path': self.processed_path,
             'features_path': self.features_path,
             'meta': self.meta,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 
 class ProcessingJob(db.Model):
     """Processing job tracking."""
     __tablename__ = 'processing_jobs'
-    
+    __table_args__ = (
+        db.Index('ix_processing_jobs_recording_created_at', 'recording_id', 'created_at'),
+        # Partial index for the hot "active jobs of a recording" lookup
+        # (Postgres only); completed/failed rows dominate over time and
+        # never match it, keeping the index tiny
+        db.Index('ix_processing_jobs_active', 'recording_id',
+                 postgresql_where=db.text("status IN ('pending', 'running')")),
+    )
+
     id = db.Column(String(36), primary_key=True, default=generate_uuid)
     recording_id = db.Column(String(36), db.ForeignKey('recordings.id'), nullable=False)
     step = db.Column(db.String(100), nullable=False)  # preprocessing, feature_extraction, training
@@ -114,13 +166,13 @@ class ProcessingJob(db.Model):
     error = db.Column(db.Text, nullable=True)
     celery_task_id = db.Column(db.String(255), nullable=True)
     started_at = db.Column(db.DateTime, nullable=True)
-    finished_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
         return {
-            'id': str(self.id),
-            'recording_id': str(self.recording_id),
+            'id': self.id,
+            'recording_id': self.recording_id,
             'step': self.step,
             'params': self.params,
             'status': self.status,
@@ -128,16 +180,23 @@ class ProcessingJob(db.Model):
             'log': self.log,
             'error': self.error,
             'celery_task_id': self.celery_task_id,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
-            'created_at': self.created_at.isoformat()
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'created_at': self.created_at
         }
 
 
 class MLModel(db.Model):
     """Machine learning model metadata and versioning."""
     __tablename__ = 'models'
-    
+    __table_args__ = (
+        db.Index('ix_models_stage_created_at', 'stage', 'created_at'),
+        db.Index('ix_models_model_type_created_at', 'model_type', 'created_at'),
+        # Partial index for the hot production-model lookup (Postgres only)
+        db.Index('ix_models_production', 'id',
+                 postgresql_where=db.text("stage = 'production'")),
+    )
+
     id = db.Column(String(36), primary_key=True, default=generate_uuid)
     name = db.Column(db.String(255), nullable=False)
     version = db.Column(db.String(50), default='1.0.0')
@@ -159,7 +218,7 @@ class MLModel(db.Model):
     
     def to_dict(self):
         return {
-            'id': str(self.id),
+            'id': self.id,
             'name': self.name,
             'version': self.version,
             'model_type': self.model_type,
@@ -170,8 +229,8 @@ class MLModel(db.Model):
             'stage': self.stage,
             's3_path': self.s3_path,
             'git_commit': self.git_commit,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 
@@ -182,7 +241,8 @@ class User(db.Model):
     id = db.Column(String(36), primary_key=True, default=generate_uuid)
     username = db.Column(db.String(100), unique=True, nullable=False)
     email = db.Column(db.String(255), unique=True, nullable=False)
-    password_hash = db.Column(db.String(255), nullable=False)
+    # Raw bcrypt output - fixed 60 bytes, no encode/decode on the login path
+    password_hash = db.Column(db.LargeBinary(60), nullable=False)
     role = db.Column(db.String(50), default='researcher')  # admin, researcher, viewer
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -190,20 +250,26 @@ class User(db.Model):
     
     def to_dict(self):
         return {
-            'id': str(self.id),
+            'id': self.id,
             'username': self.username,
             'email': self.email,
             'role': self.role,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat(),
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'created_at': self.created_at,
+            'last_login': self.last_login
         }
 
 
 class AuditLog(db.Model):
     """Audit trail for important actions."""
     __tablename__ = 'audit_logs'
-    
+    # Audit queries filter by the resource they concern and paginate by time
+    __table_args__ = (
+        db.Index('ix_audit_logs_resource', 'resource_type', 'resource_id'),
+        db.Index('ix_audit_logs_created_at', 'created_at'),
+    )
+
+
     id = db.Column(String(36), primary_key=True, default=generate_uuid)
     user_id = db.Column(String(36), nullable=True)
     action = db.Column(db.String(100), nullable=False)
@@ -215,11 +281,11 @@ class AuditLog(db.Model):
     
     def to_dict(self):
         return {
-            'id': str(self.id),
-            'user_id': str(self.user_id) if self.user_id else None,
+            'id': self.id,
+            'user_id': self.user_id,
             'action': self.action,
             'resource_type': self.resource_type,
-            'resource_id': str(self.resource_id) if self.resource_id else None,
+            'resource_id': self.resource_id,
             'details': self.details,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
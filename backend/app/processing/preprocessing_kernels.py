@@ -0,0 +1,60 @@
+"""
+Numba kernels for preprocessing hot loops
+
+Kept separate from PreprocessingPipeline so the JIT dependency stays
+optional: preprocessing.py falls back to the vectorized NumPy path when
+numba is not installed.
+"""
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def channel_moments(data):
+    """
+    Per-channel std and excess kurtosis in one fused pass.
+
+    Welford/Pebay accumulation keeps a running mean and second/third/
+    fourth central moments, so each channel is read once instead of the
+    four passes NumPy's mean -> center -> square -> quad pipeline makes,
+    and prange spreads channels across cores.
+
+    Args:
+        data: Contiguous (n_channels, n_samples) float64 array
+
+    Returns:
+        (stds, kurts) arrays; kurtosis is Fisher-style (normal -> 0),
+        matching scipy.stats.kurtosis defaults
+    """
+    n_ch, n_samples = data.shape
+    stds = np.empty(n_ch)
+    kurts = np.empty(n_ch)
+    for c in prange(n_ch):
+        mean = 0.0
+        m2 = 0.0
+        m3 = 0.0
+        m4 = 0.0
+        for i in range(n_samples):
+            n = i + 1
+            delta = data[c, i] - mean
+            delta_n = delta / n
+            delta_n2 = delta_n * delta_n
+            term1 = delta * delta_n * i
+            mean += delta_n
+            m4 += (term1 * delta_n2 * (n * n - 3 * n + 3)
+                   + 6.0 * delta_n2 * m2 - 4.0 * delta_n * m3)
+            m3 += term1 * delta_n * (n - 2) - 3.0 * delta_n * m2
+            m2 += term1
+        variance = m2 / n_samples
+        stds[c] = np.sqrt(variance)
+        if m2 > 0.0:
+            kurts[c] = n_samples * m4 / (m2 * m2) - 3.0
+        else:
+            kurts[c] = -3.0
+    return stds, kurts
+
+
+# Trigger JIT compilation at import so the first real recording doesn't pay
+# it; callers pass float32 (preprocessing casts) or float64 arrays
+channel_moments(np.zeros((1, 8)))
+channel_moments(np.zeros((1, 8), dtype=np.float32))
@@ -3,13 +3,51 @@ Visualization generation for preprocessing and analysis
 Uses seaborn for static plots (server-side rendering)
 """
 import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import numpy as np
+from scipy import fft as sp_fft
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend for server
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import seaborn as sns
 import mne
 
+logger = logging.getLogger(__name__)
+
+
+def compute_psd_fast(data: np.ndarray, sfreq: float,
+                     fmin: float = 1, fmax: float = 45) -> tuple:
+    """
+    Single Hann-windowed periodogram over the whole record.
+
+    Welch's segmenting and averaging buys variance reduction the plots
+    don't need, so one batched multithreaded rFFT across channels is
+    enough for the heatmap/violin/topomap renders and much cheaper.
+
+    Args:
+        data: (n_channels, n_samples) array
+        sfreq: Sampling frequency in Hz
+        fmin: Minimum frequency to keep
+        fmax: Maximum frequency to keep
+
+    Returns:
+        (psds, freqs) with psds in V^2/Hz, matching compute_psd units
+    """
+    data = data.astype(np.float32)
+    n = data.shape[-1]
+    window = np.hanning(n).astype(np.float32)
+
+    X = sp_fft.rfft(data * window, axis=-1, workers=-1)
+    psds = (X.real ** 2 + X.imag ** 2) / (sfreq * np.sum(window ** 2))
+    psds[..., 1:-1] *= 2  # One-sided spectrum
+
+    freqs = np.fft.rfftfreq(n, 1.0 / sfreq)
+    freq_mask = (freqs >= fmin) & (freqs <= fmax)
+    return psds[..., freq_mask], freqs[freq_mask]
+
 
 def generate_preprocessing_plots(
     raw: mne.io.Raw,
@@ -42,79 +80,95 @@ def generate_preprocessing_plots(
     
     # Set seaborn style
     sns.set_theme(style="whitegrid", palette="husl")
-    
-    # 1. PSD Heatmap
-    try:
-        fig = plot_psd_heatmap(raw)
-        local_path = os.path.join(output_dir, 'psd_heatmap.png')
-        fig.savefig(local_path, dpi=150, bbox_inches='tight')
-        plt.close(fig)
-        
-        s3_path = f"{s3_prefix}/psd_heatmap.png"
-        storage_service.upload_file(local_path, s3_path, content_type='image/png')
-        viz_paths['psd_heatmap'] = s3_path
-    except Exception as e:
-        print(f"Error generating PSD heatmap: {e}")
-    
-    # 2. Raw traces sample
-    try:
-        fig = plot_raw_traces(raw, duration=10)
-        local_path = os.path.join(output_dir, 'cleaned_traces.png')
-        fig.savefig(local_path, dpi=150, bbox_inches='tight')
-        plt.close(fig)
-        
-        s3_path = f"{s3_prefix}/cleaned_traces.png"
-        storage_service.upload_file(local_path, s3_path, content_type='image/png')
-        viz_paths['cleaned_traces'] = s3_path
-    except Exception as e:
-        print(f"Error generating traces: {e}")
-    
-    # 3. Band power violin plot
+
+    # One PSD shared by the heatmap, violin and topomap plots - the PSD
+    # is the expensive part of plotting. set_workers spreads any scipy
+    # FFTs in the per-plot fallback paths across cores as well.
     try:
-        fig = plot_band_power_violin(raw)
-        local_path = os.path.join(output_dir, 'band_power_violin.png')
+        with sp_fft.set_workers(os.cpu_count()):
+            psd = compute_psd_fast(raw.get_data(), raw.info['sfreq'],
+                                   fmin=1, fmax=45)
+    except Exception:
+        logger.exception("Error computing PSD")
+        psd = None
+
+    # Figures are built on the OO Figure/FigureCanvasAgg API, which keeps
+    # no pyplot global state, so rendering and rasterization of different
+    # plots run concurrently. Pool threads have no Flask app context, so
+    # uploads happen afterwards from the calling thread via the batch
+    # helper, which fans the PUTs out itself.
+    def _render(name, filename, plot_fn):
+        fig = plot_fn()
+        local_path = os.path.join(output_dir, filename)
         fig.savefig(local_path, dpi=150, bbox_inches='tight')
-        plt.close(fig)
-        
-        s3_path = f"{s3_prefix}/band_power_violin.png"
-        storage_service.upload_file(local_path, s3_path, content_type='image/png')
-        viz_paths['band_power_violin'] = s3_path
-    except Exception as e:
-        print(f"Error generating band power plot: {e}")
-    
-    # 4. Topomap (if montage available)
+        return name, filename, local_path
+
+    tasks = [
+        ('psd_heatmap', 'psd_heatmap.png',
+         lambda: plot_psd_heatmap(raw, psd=psd)),
+        ('cleaned_traces', 'cleaned_traces.png',
+         lambda: plot_raw_traces(raw, duration=10)),
+        ('band_power_violin', 'band_power_violin.png',
+         lambda: plot_band_power_violin(raw, psd=psd)),
+    ]
+
+    # Topomap only when a montage is available
     try:
         if raw.get_montage() is not None:
-            fig = plot_topomap(raw)
-            local_path = os.path.join(output_dir, 'topomap.png')
-            fig.savefig(local_path, dpi=150, bbox_inches='tight')
-            plt.close(fig)
-            
-            s3_path = f"{s3_prefix}/topomap.png"
-            storage_service.upload_file(local_path, s3_path, content_type='image/png')
-            viz_paths['topomap'] = s3_path
-    except Exception as e:
-        print(f"Error generating topomap: {e}")
-    
+            tasks.append(('topomap', 'topomap.png',
+                          lambda: plot_topomap(raw, psd=psd)))
+    except Exception:
+        logger.exception("Error generating topomap")
+
+    rendered = []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {
+            pool.submit(_render, *task): task[0] for task in tasks
+        }
+        for future in as_completed(futures):
+            try:
+                rendered.append(future.result())
+            except Exception:
+                logger.exception(f"Error generating {futures[future]}")
+
+    if rendered:
+        try:
+            storage_service.upload_files(
+                [(local_path, f"{s3_prefix}/{filename}")
+                 for _, filename, local_path in rendered],
+                content_type='image/png'
+            )
+            viz_paths = {
+                name: f"{s3_prefix}/{filename}"
+                for name, filename, _ in rendered
+            }
+        except Exception:
+            logger.exception("Error uploading visualizations")
+
     return viz_paths
 
 
-def plot_psd_heatmap(raw: mne.io.Raw, fmin: float = 1, fmax: float = 45) -> plt.Figure:
+def plot_psd_heatmap(raw: mne.io.Raw, fmin: float = 1, fmax: float = 45,
+                     psd: tuple = None) -> Figure:
     """
     Create PSD heatmap (channels × frequency).
-    
+
     Args:
         raw: MNE Raw object
         fmin: Minimum frequency
         fmax: Maximum frequency
-        
+        psd: Optional precomputed (psds, freqs) covering [fmin, fmax]
+
     Returns:
         Matplotlib figure
     """
-    # Compute PSD
-    spectrum = raw.compute_psd(method='welch', fmin=fmin, fmax=fmax, verbose=False)
-    psds, freqs = spectrum.get_data(return_freqs=True)
-    
+    # Compute PSD unless the caller shares a precomputed one
+    if psd is None:
+        spectrum = raw.compute_psd(method='welch', fmin=fmin, fmax=fmax, verbose=False)
+        psds, freqs = spectrum.get_data(return_freqs=True)
+    else:
+        psds, freqs = psd
+
     # Convert to dB
     psds_db = 10 * np.log10(psds)
     
@@ -122,8 +176,10 @@ def plot_psd_heatmap(raw: mne.io.Raw, fmin: float = 1, fmax: float = 45) -> plt.
     ch_names = raw.ch_names[:32] if len(raw.ch_names) > 32 else raw.ch_names
     psds_db = psds_db[:len(ch_names)]
     
-    # Create figure
-    fig, ax = plt.subplots(figsize=(12, 8))
+    # Create figure (OO API - no pyplot global state)
+    fig = Figure(figsize=(12, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
     
     # Create heatmap
     im = ax.imshow(
@@ -143,14 +199,14 @@ def plot_psd_heatmap(raw: mne.io.Raw, fmin: float = 1, fmax: float = 45) -> plt.
     ax.set_yticklabels(ch_names, fontsize=8)
     
     # Add colorbar
-    cbar = plt.colorbar(im, ax=ax)
+    cbar = fig.colorbar(im, ax=ax)
     cbar.set_label('Power (dB)', fontsize=10)
-    
-    plt.tight_layout()
+
+    fig.tight_layout()
     return fig
 
 
-def plot_raw_traces(raw: mne.io.Raw, duration: float = 10, n_channels: int = 8) -> plt.Figure:
+def plot_raw_traces(raw: mne.io.Raw, duration: float = 10, n_channels: int = 8) -> Figure:
     """
     Plot sample of raw traces.
     
@@ -170,9 +226,26 @@ def plot_raw_traces(raw: mne.io.Raw, duration: float = 10, n_channels: int = 8)
     
     data = raw.get_data(picks=picks, start=start_sample, stop=end_sample)
     times = raw.times[start_sample:end_sample]
-    
-    # Create figure
-    fig, axes = plt.subplots(n_channels, 1, figsize=(14, 2 * n_channels), sharex=True)
+
+    # Long segments give Agg far more line segments than it has pixels to
+    # draw them in; decimate to a min/max envelope per pixel column so the
+    # rendered trace is unchanged but the path stays bounded (~2 points
+    # per pixel across a 14 in x 150 dpi axis)
+    target_px = 14 * 150
+    if data.shape[1] > 2 * target_px:
+        bucket = data.shape[1] // target_px
+        n_buckets = data.shape[1] // bucket
+        buckets = data[:, :n_buckets * bucket].reshape(len(picks), n_buckets, bucket)
+        env = np.empty((len(picks), 2 * n_buckets))
+        env[:, 0::2] = buckets.min(axis=-1)
+        env[:, 1::2] = buckets.max(axis=-1)
+        data = env
+        times = np.repeat(times[:n_buckets * bucket:bucket], 2)
+
+    # Create figure (OO API - no pyplot global state)
+    fig = Figure(figsize=(14, 2 * n_channels))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(n_channels, 1, sharex=True)
     if n_channels == 1:
         axes = [axes]
     
@@ -188,18 +261,19 @@ def plot_raw_traces(raw: mne.io.Raw, duration: float = 10, n_channels: int = 8)
     
     axes[-1].set_xlabel('Time (s)', fontsize=12)
     fig.suptitle('EEG Traces (Cleaned)', fontsize=14, y=1.02)
-    
-    plt.tight_layout()
+
+    fig.tight_layout()
     return fig
 
 
-def plot_band_power_violin(raw: mne.io.Raw) -> plt.Figure:
+def plot_band_power_violin(raw: mne.io.Raw, psd: tuple = None) -> Figure:
     """
     Create violin plot of band powers across channels.
-    
+
     Args:
         raw: MNE Raw object
-        
+        psd: Optional precomputed (psds, freqs) covering 1-45 Hz
+
     Returns:
         Matplotlib figure
     """
@@ -211,28 +285,31 @@ def plot_band_power_violin(raw: mne.io.Raw) -> plt.Figure:
         'Gamma\n(30-45 Hz)': (30, 45)
     }
     
-    # Compute PSD
-    spectrum = raw.compute_psd(method='welch', fmin=1, fmax=45, verbose=False)
-    psds, freqs = spectrum.get_data(return_freqs=True)
-    
-    # Calculate band powers
-    band_powers = {}
-    for band_name, (fmin, fmax) in bands.items():
-        freq_mask = (freqs >= fmin) & (freqs <= fmax)
-        band_power = psds[:, freq_mask].mean(axis=1)
-        band_powers[band_name] = band_power
-    
-    # Prepare data for seaborn
+    # Compute PSD unless the caller shares a precomputed one
+    if psd is None:
+        spectrum = raw.compute_psd(method='welch', fmin=1, fmax=45, verbose=False)
+        psds, freqs = spectrum.get_data(return_freqs=True)
+    else:
+        psds, freqs = psd
+
+    # Band powers as one (n_bands, n_channels) array, assembled into the
+    # DataFrame column-wise instead of one dict per (band, channel) row.
+    # freqs is sorted, so searchsorted slices replace boolean-mask copies.
     import pandas as pd
-    data_list = []
-    for band_name, powers in band_powers.items():
-        for p in powers:
-            data_list.append({'Band': band_name, 'Power': p * 1e12})  # Convert to pW
-    
-    df = pd.DataFrame(data_list)
+    idx = [
+        (freqs.searchsorted(fmin, 'left'), freqs.searchsorted(fmax, 'right'))
+        for fmin, fmax in bands.values()
+    ]
+    powers = np.stack([psds[:, i0:i1].mean(axis=1) for i0, i1 in idx])
+    df = pd.DataFrame({
+        'Band': np.repeat(list(bands), psds.shape[0]),
+        'Power': powers.ravel() * 1e12  # Convert to pW
+    })
     
-    # Create violin plot
-    fig, ax = plt.subplots(figsize=(10, 6))
+    # Create violin plot (OO API - no pyplot global state)
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
     
     sns.violinplot(
         data=df,
@@ -246,31 +323,44 @@ def plot_band_power_violin(raw: mne.io.Raw) -> plt.Figure:
     ax.set_ylabel('Power (pW)', fontsize=12)
     ax.set_xlabel('Frequency Band', fontsize=12)
     ax.set_title('Band Power Distribution Across Channels', fontsize=14)
-    
-    plt.tight_layout()
+
+    fig.tight_layout()
     return fig
 
 
-def plot_topomap(raw: mne.io.Raw, band: tuple = (8, 12)) -> plt.Figure:
+def plot_topomap(raw: mne.io.Raw, band: tuple = (8, 12),
+                 psd: tuple = None) -> Figure:
     """
     Plot scalp topography for a frequency band.
-    
+
     Args:
         raw: MNE Raw object with montage
         band: (fmin, fmax) tuple
-        
+        psd: Optional precomputed (psds, freqs) covering the band
+
     Returns:
         Matplotlib figure
     """
-    # Compute PSD
-    spectrum = raw.compute_psd(method='welch', fmin=band[0], fmax=band[1], verbose=False)
-    psds, freqs = spectrum.get_data(return_freqs=True)
-    
-    # Average power in band
-    band_power = psds.mean(axis=1)
-    
-    fig, ax = plt.subplots(figsize=(8, 8))
-    
+    # Average power in band, from the shared PSD when available. Without
+    # one, a narrow SOS bandpass plus per-channel variance gives the same
+    # spatial pattern as integrating a full PSD over the band, for one
+    # streaming pass instead of a spectrum estimate.
+    if psd is None:
+        from scipy import signal as sp_signal
+        sos = sp_signal.butter(4, band, 'bandpass', fs=raw.info['sfreq'],
+                               output='sos')
+        filt = sp_signal.sosfiltfilt(sos, raw.get_data(), axis=-1)
+        band_power = filt.var(axis=-1)
+    else:
+        psds, freqs = psd
+        i0 = freqs.searchsorted(band[0], 'left')
+        i1 = freqs.searchsorted(band[1], 'right')
+        band_power = psds[:, i0:i1].mean(axis=1)
+    
+    fig = Figure(figsize=(8, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+
     mne.viz.plot_topomap(
         band_power,
         raw.info,
@@ -284,7 +374,7 @@ def plot_topomap(raw: mne.io.Raw, band: tuple = (8, 12)) -> plt.Figure:
     return fig
 
 
-def plot_confusion_matrix(y_true, y_pred, labels=None) -> plt.Figure:
+def plot_confusion_matrix(y_true, y_pred, labels=None) -> Figure:
     """
     Plot confusion matrix.
     
@@ -300,8 +390,10 @@ def plot_confusion_matrix(y_true, y_pred, labels=None) -> plt.Figure:
     
     cm = confusion_matrix(y_true, y_pred)
     
-    fig, ax = plt.subplots(figsize=(8, 6))
-    
+    fig = Figure(figsize=(8, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+
     sns.heatmap(
         cm,
         annot=True,
@@ -315,12 +407,12 @@ def plot_confusion_matrix(y_true, y_pred, labels=None) -> plt.Figure:
     ax.set_xlabel('Predicted', fontsize=12)
     ax.set_ylabel('True', fontsize=12)
     ax.set_title('Confusion Matrix', fontsize=14)
-    
-    plt.tight_layout()
+
+    fig.tight_layout()
     return fig
 
 
-def plot_roc_curve(y_true, y_proba, labels=None) -> plt.Figure:
+def plot_roc_curve(y_true, y_proba, labels=None) -> Figure:
     """
     Plot ROC curve.
     
@@ -334,8 +426,10 @@ def plot_roc_curve(y_true, y_proba, labels=None) -> plt.Figure:
     """
     from sklearn.metrics import roc_curve, auc
     
-    fig, ax = plt.subplots(figsize=(8, 6))
-    
+    fig = Figure(figsize=(8, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+
     if len(y_proba.shape) == 1 or y_proba.shape[1] == 2:
         # Binary classification
         if len(y_proba.shape) == 2:
@@ -363,12 +457,12 @@ def plot_roc_curve(y_true, y_proba, labels=None) -> plt.Figure:
     ax.set_ylabel('True Positive Rate', fontsize=12)
     ax.set_title('ROC Curve', fontsize=14)
     ax.legend(loc='lower right')
-    
-    plt.tight_layout()
+
+    fig.tight_layout()
     return fig
 
 
-def plot_feature_importance(feature_names, importances, top_n: int = 20) -> plt.Figure:
+def plot_feature_importance(feature_names, importances, top_n: int = 20) -> Figure:
     """
     Plot feature importance bar chart.
     
@@ -385,8 +479,10 @@ def plot_feature_importance(feature_names, importances, top_n: int = 20) -> plt.
     # Sort by importance
     indices = np.argsort(importances)[::-1][:top_n]
     
-    fig, ax = plt.subplots(figsize=(10, 8))
-    
+    fig = Figure(figsize=(10, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+
     df = pd.DataFrame({
         'Feature': [feature_names[i] for i in indices],
         'Importance': importances[indices]
@@ -403,6 +499,6 @@ def plot_feature_importance(feature_names, importances, top_n: int = 20) -> plt.
     ax.set_xlabel('Importance', fontsize=12)
     ax.set_ylabel('Feature', fontsize=12)
     ax.set_title(f'Top {top_n} Feature Importances', fontsize=14)
-    
-    plt.tight_layout()
+
+    fig.tight_layout()
     return fig
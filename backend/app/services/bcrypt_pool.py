@@ -0,0 +1,89 @@
+"""
+Bcrypt worker pool
+Runs password hashing off the serving thread so one slow bcrypt call
+cannot block every other request on the worker
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BcryptPoolBusy(RuntimeError):
+    """Raised when the hashing pool backlog is full."""
+    pass
+
+
+class BcryptPool:
+    """Bounded thread pool for bcrypt hash/check operations."""
+
+    def __init__(self, max_workers: int = None, max_pending: int = 500):
+        self._max_workers = max_workers or (os.cpu_count() or 1) * 2
+        self._max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self):
+        """Lazy initialization of the thread pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix='bcrypt'
+            )
+        return self._executor
+
+    @property
+    def queue_length(self) -> int:
+        """Number of bcrypt operations currently queued or running."""
+        return self._pending
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self._max_pending:
+                raise BcryptPoolBusy('bcrypt pool backlog full')
+            self._pending += 1
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def hash(self, password: str, rounds: int = None) -> bytes:
+        """
+        Hash a password on a pool thread.
+
+        Args:
+            password: Plaintext password
+            rounds: bcrypt cost factor (library default if None)
+
+        Returns:
+            Raw bcrypt hash bytes, stored as-is
+        """
+        import bcrypt  # deferred so importing the app doesn't pay for it
+
+        salt = bcrypt.gensalt(rounds=rounds) if rounds else bcrypt.gensalt()
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt)
+
+    def check(self, password: str, password_hash: bytes) -> bool:
+        """
+        Verify a password against a stored hash on a pool thread.
+
+        Args:
+            password: Plaintext password
+            password_hash: Stored bcrypt hash (bytes, or str for legacy rows)
+
+        Returns:
+            True if the password matches
+        """
+        import bcrypt
+
+        if isinstance(password_hash, str):
+            password_hash = password_hash.encode('utf-8')
+        return self._run(
+            bcrypt.checkpw, password.encode('utf-8'), password_hash
+        )
+
+
+# Singleton instance
+bcrypt_pool = BcryptPool()
@@ -0,0 +1,74 @@
+"""
+Per-worker scratch directory pool
+
+Each preprocessing task used to mkdtemp and rmtree a fresh directory,
+paying inode allocation and recursive-delete syscalls per recording.
+The pool keeps a small free list of directories that are merely emptied
+between tasks, rooted on tmpfs (/dev/shm) when available so scratch
+file I/O stays in RAM.
+"""
+import os
+import shutil
+import tempfile
+import threading
+
+_SHM = '/dev/shm'
+
+_lock = threading.Lock()
+_free = []
+
+
+def _base_dir() -> str:
+    """Root for pooled scratch dirs - tmpfs when the host has one."""
+    if os.path.isdir(_SHM):
+        base = os.path.join(_SHM, 'neurolab')
+        os.makedirs(base, exist_ok=True)
+        return base
+    return tempfile.gettempdir()
+
+
+def prewarm(n: int = 2, prefix: str = 'neurolab_'):
+    """
+    Pre-create scratch directories, called from worker process init so
+    the first tasks skip the mkdtemp.
+
+    Args:
+        n: Target free-list size (roughly worker concurrency)
+        prefix: Directory name prefix
+    """
+    with _lock:
+        while len(_free) < n:
+            _free.append(tempfile.mkdtemp(prefix=prefix, dir=_base_dir()))
+
+
+def acquire(prefix: str = 'neurolab_') -> str:
+    """Take a scratch directory from the pool, creating one if empty."""
+    with _lock:
+        if _free:
+            return _free.pop()
+    return tempfile.mkdtemp(prefix=prefix, dir=_base_dir())
+
+
+def release(path: str):
+    """
+    Empty a scratch directory and return it to the pool.
+
+    Unlinks children instead of removing the directory itself, so the
+    inode is reused by the next task.
+    """
+    try:
+        for name in os.listdir(path):
+            child = os.path.join(path, name)
+            if os.path.isdir(child) and not os.path.islink(child):
+                shutil.rmtree(child, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(child)
+                except OSError:
+                    pass
+    except OSError:
+        # Directory vanished or is unreadable - drop it from the pool
+        shutil.rmtree(path, ignore_errors=True)
+        return
+    with _lock:
+        _free.append(path)
@@ -4,6 +4,14 @@ Handles all object storage operations
 """
 import os
 import io
+import hashlib
+import hmac
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from datetime import datetime, timezone
+from urllib.parse import quote
+
 from minio import Minio
 from minio.error import S3Error
 from flask import current_app
@@ -14,7 +22,21 @@ class StorageService:
     
     def __init__(self):
         self._client = None
-    
+        self._redis_client = None
+
+    def _redis(self):
+        """Lazy Redis client for URL caching; None when unreachable."""
+        if self._redis_client is None:
+            try:
+                import redis
+                self._redis_client = redis.from_url(
+                    current_app.config.get('REDIS_URL', 'redis://localhost:6379/0')
+                )
+            except Exception:
+                return None
+        return self._redis_client
+
+
     @property
     def client(self):
         """Lazy initialization of MinIO client."""
@@ -55,19 +77,66 @@ class StorageService:
             Full S3 path to uploaded object
         """
         self.ensure_bucket()
-        
+
         try:
+            # 64 MB parts pushed by several uploaders at once: large FIF
+            # artifacts multipart cleanly instead of degenerating into
+            # many small sequential part PUTs
             self.client.fput_object(
                 self.bucket,
                 object_name,
                 file_path,
-                content_type=content_type
+                content_type=content_type,
+                part_size=64 * 1024 * 1024,
+                num_parallel_uploads=8
             )
             return f"s3://{self.bucket}/{object_name}"
         except S3Error as e:
             current_app.logger.error(f"Error uploading file: {e}")
             raise
     
+    def upload_files(self, uploads: list, content_type: str = None,
+                     max_workers: int = 4) -> list:
+        """
+        Upload several files concurrently.
+
+        Each PUT is a synchronous round-trip, so uploading N small files
+        serially costs N x RTT; fanning out over a thread pool overlaps
+        the round-trips. The client and bucket are resolved once here
+        because worker threads have no Flask app context.
+
+        Args:
+            uploads: List of (file_path, object_name) pairs
+            content_type: MIME type applied to every object
+            max_workers: Thread pool size
+
+        Returns:
+            Full S3 paths in the same order as `uploads`
+        """
+        if not uploads:
+            return []
+
+        self.ensure_bucket()
+        client = self.client
+        bucket = self.bucket
+
+        def _put(pair):
+            file_path, object_name = pair
+            client.fput_object(
+                bucket,
+                object_name,
+                file_path,
+                content_type=content_type
+            )
+            return f"s3://{bucket}/{object_name}"
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                return list(pool.map(_put, uploads))
+        except S3Error as e:
+            current_app.logger.error(f"Error uploading files: {e}")
+            raise
+
     def upload_bytes(self, data: bytes, object_name: str, content_type: str = None) -> str:
         """
         Upload bytes data to object storage.
@@ -96,6 +165,40 @@ class StorageService:
             current_app.logger.error(f"Error uploading bytes: {e}")
             raise
     
+    def upload_stream(self, fileobj, object_name: str, content_type: str = None,
+                      part_size: int = 16 * 1024 * 1024) -> str:
+        """
+        Upload from a file-like object without staging to disk.
+
+        Uses multipart upload with unknown length, so arbitrarily large
+        streams are pushed through in part_size chunks.
+
+        Args:
+            fileobj: Readable binary stream
+            object_name: Destination path in bucket
+            content_type: MIME type
+            part_size: Multipart chunk size in bytes
+
+        Returns:
+            Full S3 path to uploaded object
+        """
+        self.ensure_bucket()
+
+        try:
+            self.client.put_object(
+                self.bucket,
+                object_name,
+                fileobj,
+                length=-1,
+                part_size=part_size,
+                content_type=content_type,
+                num_parallel_uploads=8
+            )
+            return f"s3://{self.bucket}/{object_name}"
+        except S3Error as e:
+            current_app.logger.error(f"Error uploading stream: {e}")
+            raise
+
     def download_file(self, object_name: str, local_path: str) -> str:
         """
         Download a file from object storage.
@@ -114,22 +217,35 @@ class StorageService:
             current_app.logger.error(f"Error downloading file: {e}")
             raise
     
-    def download_bytes(self, object_name: str) -> bytes:
+    def download_bytes(self, object_name: str) -> bytearray:
         """
-        Download file as bytes.
-        
+        Download file into one exactly-sized buffer.
+
+        The object size is known up front from stat_object, so the
+        buffer is allocated once and filled chunk by chunk - no growth
+        doubling and no final concatenation copy, which matters on the
+        half-gigabyte FIF artifacts.
+
         Args:
             object_name: Path in bucket
-            
+
         Returns:
-            File contents as bytes
+            File contents as a bytes-like bytearray
         """
         try:
+            size = self.client.stat_object(self.bucket, object_name).size
+            buf = bytearray(size)
+            view = memoryview(buf)
+            offset = 0
             response = self.client.get_object(self.bucket, object_name)
-            data = response.read()
-            response.close()
-            response.release_conn()
-            return data
+            try:
+                for chunk in response.stream(1 << 20):
+                    view[offset:offset + len(chunk)] = chunk
+                    offset += len(chunk)
+            finally:
+                response.close()
+                response.release_conn()
+            return buf
         except S3Error as e:
             current_app.logger.error(f"Error downloading bytes: {e}")
             raise
@@ -151,14 +267,48 @@ class StorageService:
             current_app.logger.error(f"Error deleting file: {e}")
             raise
     
-    def list_objects(self, prefix: str = "", recursive: bool = True) -> list:
+    def delete_files(self, object_names: list) -> bool:
+        """
+        Delete many objects in a single DeleteObjects round-trip.
+
+        S3 accepts up to 1000 keys per call, so this replaces N serial
+        remove_object round-trips on multi-file cleanup paths.
+
+        Args:
+            object_names: Paths in bucket
+
+        Returns:
+            True if no per-object errors were reported
+        """
+        from minio.deleteobjects import DeleteObject
+
+        if not object_names:
+            return True
+        try:
+            errors = list(self.client.remove_objects(
+                self.bucket,
+                [DeleteObject(name) for name in object_names]
+            ))
+            for err in errors:
+                current_app.logger.error(
+                    f"Error deleting {err.name}: {err.message}"
+                )
+            return not errors
+        except S3Error as e:
+            current_app.logger.error(f"Error deleting files: {e}")
+            raise
+
+    def list_objects(self, prefix: str = "", recursive: bool = True,
+                     max_keys: int = None) -> list:
         """
         List objects in bucket with optional prefix filter.
-        
+
         Args:
             prefix: Path prefix to filter
             recursive: Include subdirectories
-            
+            max_keys: Stop after this many keys; the listing generator is
+                paged lazily, so bounding it avoids walking large prefixes
+
         Returns:
             List of object names
         """
@@ -168,34 +318,134 @@ class StorageService:
                 prefix=prefix,
                 recursive=recursive
             )
+            if max_keys is not None:
+                objects = islice(objects, max_keys)
             return [obj.object_name for obj in objects]
         except S3Error as e:
             current_app.logger.error(f"Error listing objects: {e}")
             raise
     
+    def list_prefix(self, prefix: str) -> set:
+        """
+        List object names under a prefix as a set, in one LIST round-trip.
+
+        Cheaper than calling object_exists() per key when probing several
+        objects that share a prefix.
+
+        Args:
+            prefix: Path prefix to filter
+
+        Returns:
+            Set of object names
+        """
+        return set(self.list_objects(prefix=prefix, recursive=False))
+
     def get_presigned_url(self, object_name: str, expires_hours: int = 24) -> str:
         """
         Generate a presigned URL for temporary access.
-        
+
+        URLs are cached in Redis for half their lifetime, so repeat
+        requests within the window get the same URL back - browsers can
+        then cache the object itself - and the SigV4 signing is skipped.
+
         Args:
             object_name: Path in bucket
             expires_hours: Hours until URL expires
-            
+
         Returns:
             Presigned URL string
         """
         from datetime import timedelta
+
+        # Same URL while at least half its lifetime remains
+        window = expires_hours * 1800
+        cache_key = (
+            f"psurl:{self.bucket}:{object_name}:{int(time.time() // window)}"
+        )
+        cache = self._redis()
+        if cache is not None:
+            try:
+                cached = cache.get(cache_key)
+                if cached:
+                    return cached.decode()
+            except Exception:
+                cache = None  # Redis down - sign directly
+
         try:
             url = self.client.presigned_get_object(
                 self.bucket,
                 object_name,
                 expires=timedelta(hours=expires_hours)
             )
-            return url
         except S3Error as e:
             current_app.logger.error(f"Error generating presigned URL: {e}")
             raise
+
+        if cache is not None:
+            try:
+                cache.set(cache_key, url, ex=window)
+            except Exception:
+                pass
+        return url
     
+    def batch_presigned_get_urls(self, object_names: list, expires_hours: int = 1) -> list:
+        """
+        Presign GET URLs for many objects with one signing-key derivation.
+
+        The SigV4 signing key and canonical query string depend only on
+        credentials, date, region, and expiry, so they are computed once per
+        batch; each object then costs a single HMAC-SHA256 over its canonical
+        request. Output is byte-identical to get_presigned_url.
+
+        Args:
+            object_names: Paths in bucket
+            expires_hours: Hours until URLs expire
+
+        Returns:
+            List of presigned URLs, in input order
+        """
+        config = current_app.config
+        endpoint = config.get('MINIO_ENDPOINT', 'localhost:9000')
+        secure = config.get('MINIO_SECURE', False)
+        region = config.get('MINIO_REGION', 'us-east-1')
+        access_key = config.get('MINIO_ACCESS_KEY', 'minioadmin')
+        secret_key = config.get('MINIO_SECRET_KEY', 'minioadmin')
+        scheme = 'https' if secure else 'http'
+        expires = expires_hours * 3600
+
+        now = datetime.now(timezone.utc)
+        amzdate = now.strftime('%Y%m%dT%H%M%SZ')
+        datestamp = amzdate[:8]
+        scope = f"{datestamp}/{region}/s3/aws4_request"
+
+        # Signing key: chained HMAC over date/region/service, derived once
+        signing_key = ('AWS4' + secret_key).encode()
+        for part in (datestamp, region, 's3', 'aws4_request'):
+            signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+
+        credential = quote(f"{access_key}/{scope}", safe='')
+        query = (
+            f"X-Amz-Algorithm=AWS4-HMAC-SHA256&X-Amz-Credential={credential}"
+            f"&X-Amz-Date={amzdate}&X-Amz-Expires={expires}&X-Amz-SignedHeaders=host"
+        )
+
+        urls = []
+        for object_name in object_names:
+            uri = '/' + quote(f"{self.bucket}/{object_name}", safe='/')
+            canonical_request = (
+                f"GET\n{uri}\n{query}\nhost:{endpoint}\n\nhost\nUNSIGNED-PAYLOAD"
+            )
+            string_to_sign = (
+                f"AWS4-HMAC-SHA256\n{amzdate}\n{scope}\n"
+                f"{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+            )
+            signature = hmac.new(
+                signing_key, string_to_sign.encode(), hashlib.sha256
+            ).hexdigest()
+            urls.append(f"{scheme}://{endpoint}{uri}?{query}&X-Amz-Signature={signature}")
+
+        return urls
+
     def object_exists(self, object_name: str) -> bool:
         """Check if an object exists in storage."""
         try:
@@ -1,8 +1,31 @@
 """Celery tasks module"""
+from celery.signals import worker_process_init
+
+# One Flask app per worker process: create_app re-initializes extensions
+# (SQLAlchemy engine, limiter, logger handlers), which is cold-start work
+# tasks should not repeat per invocation
+_worker_app = None
+
+
+def get_worker_app():
+    """Return the process-wide Flask app, building it on first use."""
+    global _worker_app
+    if _worker_app is None:
+        from app import create_app
+        _worker_app = create_app()
+    return _worker_app
+
+
+@worker_process_init.connect
+def _init_worker_app(**kwargs):
+    get_worker_app()
+
+
 from .preprocessing import preprocess_recording, preprocess_batch
 from .features import extract_features_task
 from .training import train_model_task, check_auto_retrain, load_model_and_predict
 from .realtime import process_realtime_chunk, realtime_inference
+from .storage import build_presigned_manifest
 
 __all__ = [
     'preprocess_recording',
@@ -12,5 +35,6 @@ __all__ = [
     'check_auto_retrain',
     'load_model_and_predict',
     'process_realtime_chunk',
-    'realtime_inference'
+    'realtime_inference',
+    'build_presigned_manifest'
 ]
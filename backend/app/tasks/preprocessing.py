@@ -4,7 +4,6 @@ Full MNE-based preprocessing pipeline
 """
 import os
 import json
-import tempfile
 from datetime import datetime
 from celery import shared_task
 from celery.utils.log import get_task_logger
@@ -31,13 +30,15 @@ def preprocess_recording(self, recording_id: str, job_id: str):
     8. Generate visualizations
     """
     from flask import current_app
-    from app import create_app
+    from app.tasks import get_worker_app
     from app.models import db, Recording, ProcessingJob
     from app.services.storage import storage_service
     from app.processing.preprocessing import PreprocessingPipeline
     from app.processing.visualization import generate_preprocessing_plots
-    
-    app = create_app()
+    from app.tasks.progress import ProgressReporter
+    from app.services import scratch_pool
+
+    app = get_worker_app()
     
     with app.app_context():
         # Get recording and job
@@ -53,18 +54,19 @@ def preprocess_recording(self, recording_id: str, job_id: str):
         job.started_at = datetime.utcnow()
         job.log = "Starting preprocessing...\n"
         db.session.commit()
-        
-        temp_dir = tempfile.mkdtemp(prefix='neurolab_')
-        
+
+        # Intermediate progress goes through the result backend; the job
+        # row is written once per task outcome instead of once per step
+        reporter = ProgressReporter(self, job)
+        temp_dir = scratch_pool.acquire(prefix='neurolab_')
+
         try:
             # Get config
             config = current_app.config.get('PROCESSING_CONFIG', {})
-            
+
             # Download raw file
-            job.log += "Downloading raw file...\n"
-            job.progress = 0.1
-            db.session.commit()
-            
+            reporter.update("Downloading raw file...\n", progress=0.1)
+
             s3_path = recording.s3_path.replace(f's3://{storage_service.bucket}/', '')
             local_raw_path = os.path.join(temp_dir, os.path.basename(s3_path))
             storage_service.download_file(s3_path, local_raw_path)
@@ -73,13 +75,11 @@ def preprocess_recording(self, recording_id: str, job_id: str):
             pipeline = PreprocessingPipeline(config)
             
             # Read raw file
-            job.log += "Reading raw file...\n"
-            job.progress = 0.2
-            db.session.commit()
-            
+            reporter.update("Reading raw file...\n", progress=0.2)
+
             raw = pipeline.read_raw(local_raw_path)
-            
-            # Update recording metadata
+
+            # Update recording metadata (persisted with the final commit)
             recording.sfreq = int(raw.info['sfreq'])
             recording.channels = len(raw.ch_names)
             recording.duration_sec = raw.times[-1]
@@ -88,66 +88,63 @@ def preprocess_recording(self, recording_id: str, job_id: str):
                 'original_sfreq': int(raw.info['sfreq']),
                 'original_channels': raw.ch_names
             }
-            db.session.commit()
-            
+
             # Resample
-            job.log += f"Resampling to {config.get('target_sfreq', 250)} Hz...\n"
-            job.progress = 0.3
-            db.session.commit()
-            
+            reporter.update(
+                f"Resampling to {config.get('target_sfreq', 250)} Hz...\n",
+                progress=0.3
+            )
             raw = pipeline.resample(raw)
-            
+
             # Notch filter
-            job.log += f"Applying notch filter at {config.get('notch_freqs', [50])} Hz...\n"
-            job.progress = 0.4
-            db.session.commit()
-            
+            reporter.update(
+                f"Applying notch filter at {config.get('notch_freqs', [50])} Hz...\n",
+                progress=0.4
+            )
             raw = pipeline.notch_filter(raw)
-            
+
             # Bandpass filter
             bandpass = config.get('bandpass', {'low': 1.0, 'high': 40.0})
-            job.log += f"Applying bandpass filter {bandpass['low']}-{bandpass['high']} Hz...\n"
-            job.progress = 0.5
-            db.session.commit()
-            
+            reporter.update(
+                f"Applying bandpass filter {bandpass['low']}-{bandpass['high']} Hz...\n",
+                progress=0.5
+            )
             raw = pipeline.bandpass_filter(raw)
-            
+
             # Detect bad channels
-            job.log += "Detecting bad channels...\n"
-            job.progress = 0.6
-            db.session.commit()
-            
+            reporter.update("Detecting bad channels...\n", progress=0.6)
+
             raw, bad_channels = pipeline.detect_bad_channels(raw)
-            job.log += f"  Found {len(bad_channels)} bad channels: {bad_channels}\n"
-            
+            reporter.update(f"  Found {len(bad_channels)} bad channels: {bad_channels}\n")
+
             # Check if too many bad channels
             bad_pct = len(bad_channels) / len(raw.ch_names)
             if bad_pct > config.get('artifact', {}).get('max_bad_channels_pct', 0.25):
-                job.log += f"  WARNING: {bad_pct*100:.1f}% channels marked bad, needs manual review\n"
+                reporter.update(
+                    f"  WARNING: {bad_pct*100:.1f}% channels marked bad, needs manual review\n"
+                )
                 recording.status = 'needs_review'
                 recording.meta['bad_channels'] = bad_channels
                 recording.meta['bad_channel_pct'] = bad_pct
-                db.session.commit()
-            
+
             # Interpolate bad channels
             if bad_channels:
-                job.log += "Interpolating bad channels...\n"
+                reporter.update("Interpolating bad channels...\n")
                 raw = pipeline.interpolate_bads(raw)
-            
+
             # ICA artifact removal
-            job.log += "Running ICA for artifact removal...\n"
-            job.progress = 0.7
-            db.session.commit()
-            
-            raw, ica_info = pipeline.run_ica(raw)
-            job.log += f"  Removed {len(ica_info.get('excluded_components', []))} ICA components\n"
+            reporter.update("Running ICA for artifact removal...\n", progress=0.7)
+
+            # The pre-ICA raw is discarded, so clean in place
+            raw, ica_info = pipeline.run_ica(raw, copy=False)
+            reporter.update(
+                f"  Removed {len(ica_info.get('excluded_components', []))} ICA components\n"
+            )
             recording.meta['ica_info'] = ica_info
-            
+
             # Save cleaned raw
-            job.log += "Saving cleaned data...\n"
-            job.progress = 0.85
-            db.session.commit()
-            
+            reporter.update("Saving cleaned data...\n", progress=0.85)
+
             cleaned_filename = f"cleaned_raw.fif"
             cleaned_local_path = os.path.join(temp_dir, cleaned_filename)
             raw.save(cleaned_local_path, overwrite=True)
@@ -158,10 +155,8 @@ def preprocess_recording(self, recording_id: str, job_id: str):
             recording.processed_path = f"s3://{storage_service.bucket}/{cleaned_s3_path}"
             
             # Generate visualizations
-            job.log += "Generating visualizations...\n"
-            job.progress = 0.9
-            db.session.commit()
-            
+            reporter.update("Generating visualizations...\n", progress=0.9)
+
             viz_paths = generate_preprocessing_plots(
                 raw, 
                 recording_id, 
@@ -178,11 +173,11 @@ def preprocess_recording(self, recording_id: str, job_id: str):
             recording.meta['aligned_channels'] = raw.ch_names
             
             # Complete job
+            reporter.update("Preprocessing completed successfully.\n", progress=1.0)
+            reporter.flush()
             job.status = 'completed'
-            job.progress = 1.0
             job.finished_at = datetime.utcnow()
-            job.log += "Preprocessing completed successfully.\n"
-            
+
             db.session.commit()
             
             logger.info(f"Preprocessing completed for recording {recording_id}")
@@ -197,14 +192,15 @@ def preprocess_recording(self, recording_id: str, job_id: str):
             
         except Exception as e:
             logger.error(f"Preprocessing failed for {recording_id}: {str(e)}")
-            
+
+            reporter.update(f"\nERROR: {str(e)}\n")
+            reporter.flush()
             job.status = 'failed'
             job.error = str(e)
             job.finished_at = datetime.utcnow()
-            job.log += f"\nERROR: {str(e)}\n"
-            
+
             recording.status = 'failed'
-            
+
             db.session.commit()
             
             return {
@@ -214,43 +210,49 @@ def preprocess_recording(self, recording_id: str, job_id: str):
             }
             
         finally:
-            # Cleanup temp directory
-            import shutil
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+            # Empty the scratch dir and hand it back for the next task
+            scratch_pool.release(temp_dir)
 
 
 @shared_task(bind=True, name='app.tasks.preprocessing.preprocess_batch')
 def preprocess_batch(self, recording_ids: list):
     """
     Preprocess multiple recordings in batch.
+
+    Creates all jobs in one commit, then dispatches the per-recording
+    tasks as a Celery group so they spread across worker slots instead
+    of running sequentially inside this one. Returns the dispatched
+    job/task ids; per-recording outcomes land on their own results.
     """
-    results = []
-    for i, recording_id in enumerate(recording_ids):
-        self.update_state(
-            state='PROGRESS',
-            meta={'current': i, 'total': len(recording_ids)}
-        )
-        
-        # Create job and run preprocessing
-        from app import create_app
-        from app.models import db, ProcessingJob
-        
-        app = create_app()
-        with app.app_context():
-            job = ProcessingJob(
+    from celery import group
+    from app.tasks import get_worker_app
+    from app.models import db, ProcessingJob
+
+    app = get_worker_app()
+    with app.app_context():
+        jobs = [
+            ProcessingJob(
                 recording_id=recording_id,
                 step='preprocessing',
                 status='pending'
             )
-            db.session.add(job)
-            db.session.commit()
-            
-            result = preprocess_recording(recording_id, str(job.id))
-            results.append(result)
-    
+            for recording_id in recording_ids
+        ]
+        db.session.add_all(jobs)
+        db.session.commit()
+
+        job_ids = [str(job.id) for job in jobs]
+
+    result = group(
+        preprocess_recording.s(recording_id, job_id)
+        for recording_id, job_id in zip(recording_ids, job_ids)
+    ).apply_async()
+
     return {
-        'completed': len([r for r in results if r['status'] == 'completed']),
-        'failed': len([r for r in results if r['status'] == 'failed']),
-        'results': results
+        'dispatched': len(recording_ids),
+        'group_id': result.id,
+        'jobs': [
+            {'recording_id': rid, 'job_id': jid, 'task_id': child.id}
+            for rid, jid, child in zip(recording_ids, job_ids, result.children or [])
+        ]
     }
@@ -0,0 +1,58 @@
+"""
+Buffered progress reporting for long-running Celery tasks
+
+Each intermediate `job.progress`/`job.log` write used to be its own
+Postgres commit, serializing tasks on the ProcessingJob row just to
+publish progress. The reporter keeps both in memory, publishes
+intermediate state through Celery's result backend (fire-and-forget),
+and flushes to the job row once at the task boundary.
+"""
+import io
+
+
+class ProgressReporter:
+    """Buffers job log/progress updates between database flushes."""
+
+    def __init__(self, task, job):
+        """
+        Args:
+            task: Bound Celery task (used for update_state), or None
+            job: ProcessingJob row to flush into
+        """
+        self.task = task
+        self.job = job
+        self.progress = job.progress or 0.0
+        self._log = io.StringIO()
+
+    def update(self, message: str = None, progress: float = None):
+        """
+        Record a log line and/or progress value.
+
+        Publishes to the Celery result backend so pollers see live
+        progress without a database write.
+        """
+        if message is not None:
+            self._log.write(message)
+        if progress is not None:
+            self.progress = progress
+        if self.task is not None:
+            try:
+                self.task.update_state(
+                    state='PROGRESS',
+                    meta={'progress': self.progress,
+                          'log_tail': message or ''}
+                )
+            except Exception:
+                pass  # Progress publishing must never fail the task
+
+    def flush(self):
+        """Fold the buffered log and progress into the job row.
+
+        The caller owns the commit, so the flush can ride along with the
+        task's final status update.
+        """
+        buffered = self._log.getvalue()
+        if buffered:
+            self.job.log = (self.job.log or '') + buffered
+            self._log = io.StringIO()
+        self.job.progress = self.progress
@@ -108,11 +108,11 @@ def process_realtime_chunk(self, recording_id: str, chunk_data: list, sfreq: int
         sfreq: Sampling frequency
     """
     from flask import current_app
-    from app import create_app
+    from app.tasks import get_worker_app
     from app.processing.preprocessing import PreprocessingPipeline
     from app.processing.features import FeatureExtractor
     
-    app = create_app()
+    app = get_worker_app()
     
     with app.app_context():
         config = current_app.config.get('PROCESSING_CONFIG', {})
@@ -237,11 +237,11 @@ def realtime_inference(self, recording_id: str, model_id: str):
         model_id: Model ID to use
     """
     from flask import current_app
-    from app import create_app
+    from app.tasks import get_worker_app
     from app.models import MLModel
     from app.services.storage import storage_service
     
-    app = create_app()
+    app = get_worker_app()
     
     with app.app_context():
         config = current_app.config.get('PROCESSING_CONFIG', {})
@@ -307,8 +307,7 @@ def realtime_inference(self, recording_id: str, model_id: str):
                 
             finally:
                 import shutil
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
+                shutil.rmtree(temp_dir, ignore_errors=True)
                     
         except Exception as e:
             logger.error(f"Realtime inference error: {str(e)}")
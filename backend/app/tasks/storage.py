@@ -0,0 +1,100 @@
+"""
+Storage I/O Celery tasks
+
+Enumerate-and-presign work offloaded from request threads. The resulting
+manifest (object names plus presigned URLs) is cached in Redis so repeat
+requests are served at memory latency; the short TTL keeps cached URLs
+well inside their expiry window.
+"""
+import json
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+# Cache lifetime - far below the 1h presign expiry so served URLs stay valid
+MANIFEST_TTL = 300  # seconds
+MANIFEST_MAX_KEYS = 100
+
+_redis_client = None
+
+
+def _get_redis(app):
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.from_url(
+            app.config.get('REDIS_URL', 'redis://localhost:6379/0')
+        )
+    return _redis_client
+
+
+def manifest_cache_key(prefix: str) -> str:
+    return f"manifest:{prefix}"
+
+
+def _build_manifest(app, prefix: str, expires_hours: int) -> dict:
+    from app.services.storage import storage_service
+
+    files = storage_service.list_objects(prefix=prefix,
+                                         max_keys=MANIFEST_MAX_KEYS)
+    urls = storage_service.batch_presigned_get_urls(
+        files, expires_hours=expires_hours
+    )
+    manifest = {'files': files, 'urls': urls}
+    try:
+        _get_redis(app).set(
+            manifest_cache_key(prefix), json.dumps(manifest), ex=MANIFEST_TTL
+        )
+    except Exception:
+        pass
+    return manifest
+
+
+@shared_task(name='app.tasks.storage.build_presigned_manifest')
+def build_presigned_manifest(prefix: str, expires_hours: int = 1):
+    """Build and cache the presigned-URL manifest for an S3 prefix."""
+    from app.tasks import get_worker_app
+
+    app = get_worker_app()
+    with app.app_context():
+        return _build_manifest(app, prefix, expires_hours)
+
+
+def get_presigned_manifest(prefix: str, expires_hours: int = 1) -> dict:
+    """
+    Manifest for a prefix: Redis cache first, then the io-queue worker.
+
+    Falls back to building inline when no broker or worker is reachable -
+    signing is local HMAC, so the inline path stays cheap. Must be called
+    inside an application context.
+    """
+    from flask import current_app
+
+    app = current_app._get_current_object()
+    try:
+        cached = _get_redis(app).get(manifest_cache_key(prefix))
+        if cached is not None:
+            return json.loads(cached)
+    except Exception:
+        pass
+
+    try:
+        return build_presigned_manifest.apply_async(
+            args=[prefix], kwargs={'expires_hours': expires_hours}, expires=10
+        ).get(timeout=2)
+    except Exception:
+        return _build_manifest(app, prefix, expires_hours)
+
+
+def invalidate_manifest(prefix: str):
+    """Drop a cached manifest (e.g. after new plots are uploaded)."""
+    from flask import current_app
+
+    try:
+        _get_redis(current_app._get_current_object()).delete(
+            manifest_cache_key(prefix)
+        )
+    except Exception:
+        pass
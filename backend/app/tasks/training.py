@@ -48,14 +48,14 @@ def train_model_task(
         labels: Dict mapping recording_id -> label
     """
     from flask import current_app
-    from app import create_app
+    from app.tasks import get_worker_app
     from app.models import db, MLModel, Recording
     from app.services.storage import storage_service
     from app.processing.visualization import (
         plot_confusion_matrix, plot_roc_curve, plot_feature_importance
     )
     
-    app = create_app()
+    app = get_worker_app()
     
     with app.app_context():
         model = MLModel.query.get(model_id)
@@ -263,8 +263,7 @@ def train_model_task(
             
         finally:
             import shutil
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 
 def build_logistic_pipeline(config: dict) -> Pipeline:
@@ -307,10 +306,10 @@ def check_auto_retrain():
     Check if auto-retrain should be triggered.
     Runs on schedule (e.g., hourly).
     """
-    from app import create_app
+    from app.tasks import get_worker_app
     from app.models import db, Recording, MLModel
     
-    app = create_app()
+    app = get_worker_app()
     
     with app.app_context():
         # Count new recordings with features since last training
@@ -344,11 +343,11 @@ def load_model_and_predict(model_id: str, recording_id: str = None, features: li
         Prediction results
     """
     from flask import current_app
-    from app import create_app
+    from app.tasks import get_worker_app
     from app.models import MLModel, Recording
     from app.services.storage import storage_service
     
-    app = create_app()
+    app = get_worker_app()
     
     with app.app_context():
         model = MLModel.query.get(model_id)
@@ -395,5 +394,4 @@ def load_model_and_predict(model_id: str, recording_id: str = None, features: li
             
         finally:
             import shutil
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+            shutil.rmtree(temp_dir, ignore_errors=True)